@@ -1,37 +1,64 @@
 """Flask app for Samut Songkhram tourism."""
 
+import atexit
 import json
 import os
 import sys
-import datetime
+import functools
+import gzip
+import hashlib
+import io
+import itertools
+import mimetypes
+import re
 import concurrent.futures
 import logging
+import logging.handlers
+import queue
+import threading
+from collections import OrderedDict
 from concurrent.futures import TimeoutError
-from dotenv import load_dotenv
-from flask import Flask, request, jsonify, Response, send_from_directory, abort
+import requests
+from flask import Flask, request, jsonify, Response, send_file, send_from_directory, abort, after_this_request
 from flask_cors import CORS
+from werkzeug.security import safe_join
+
+try:
+    from whitenoise import WhiteNoise
+except ImportError:  # pragma: no cover - optional dependency during runtime
+    WhiteNoise = None  # type: ignore
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Setup logging for debugging
-logging.basicConfig(
-    level=logging.INFO,
-    format='[%(asctime)s] [%(levelname)s] %(message)s'
-)
+# Records go through a queue to a listener thread, so request handlers only do
+# a non-blocking put instead of writing to stderr under the handler lock.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler(sys.stderr)
+_log_stream_handler.setFormatter(logging.Formatter('[%(asctime)s] [%(levelname)s] %(message)s'))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream_handler, respect_handler_level=True)
+_log_queue_handler = logging.handlers.QueueHandler(_log_queue)
+# QueueHandler pre-renders the message; the listener's handler adds the prefix
+_log_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[_log_queue_handler])
+_log_listener.start()
+atexit.register(_log_listener.stop)  # Flush queued records on shutdown
 logger = logging.getLogger(__name__)
 
-# Ensure the current directory and optional 'backend' subdirectory are in sys.path.
+# Ensure the project root is importable so everything loads as ``backend.*``.
+# backend/ itself is deliberately NOT added: that made modules importable under
+# two names (``semantic_search`` and ``backend.semantic_search``), executing
+# them twice and loading the embedding model once per copy.
 current_dir = os.path.dirname(__file__)
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 backend_dir = os.path.join(current_dir, 'backend')
-if os.path.isdir(backend_dir) and backend_dir not in sys.path:
-    sys.path.insert(0, backend_dir)
 
 # Load environment variables from .env files
-# First try root directory, then backend directory
-load_dotenv()  # Load from root if exists
-backend_env_path = os.path.join(backend_dir, '.env')
-if os.path.exists(backend_env_path):
-    load_dotenv(backend_env_path, override=True)  # Load from backend/.env (takes priority)
+# First try root directory, then backend directory (takes priority); served
+# from backend/.env.cache.json while it matches both files
+from backend.env_cache import load_env_files
+load_env_files(current_dir or '.', backend_dir)
 
 """Import constants and optional route handlers."""
 # Pre-bind names to avoid static analysis warnings when optional imports fail
@@ -67,6 +94,106 @@ except ImportError as import_error:
 # Default timeout for GPT calls to avoid worker hangs
 CHAT_TIMEOUT_SECONDS = int(os.getenv("CHAT_TIMEOUT_SECONDS", str(DEFAULT_CHAT_TIMEOUT_SECONDS)))
 
+# ===== Shared pool for blocking GPT calls =====
+# SSE generators hand the blocking OpenAI iteration to this bounded pool and
+# drain a queue, so they can send heartbeats while waiting for the first token
+# and give up after CHAT_TIMEOUT_SECONDS instead of wedging the worker.
+# /api/messages runs its non-streaming chat call here for the same timeout.
+from backend.pool_utils import default_pool_size
+
+_GPT_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=int(os.getenv('GPT_POOL_SIZE', str(default_pool_size()))),
+    thread_name_prefix='gpt',
+)
+atexit.register(_GPT_POOL.shutdown, wait=False)
+SSE_HEARTBEAT_SECONDS = 5
+# OpenAI streams 1-3 character tokens; merge those arriving within this window
+# (up to SSE_COALESCE_MAX_CHARS) into one SSE frame to cut per-frame writes
+SSE_COALESCE_SECONDS = 0.04
+SSE_COALESCE_MAX_CHARS = 256
+_STREAM_DONE = object()
+
+
+class _StreamFailure:
+    """Carries an exception from the producer thread to the SSE generator."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _iter_in_pool(make_iterator, timeout: float = CHAT_TIMEOUT_SECONDS,
+                  heartbeat: float = SSE_HEARTBEAT_SECONDS, coalesce: str | None = None):
+    """Run ``make_iterator()`` on _GPT_POOL and yield its items as they arrive.
+
+    Yields None whenever ``heartbeat`` seconds pass without an item. Raises
+    TimeoutError once ``timeout`` seconds have elapsed, and re-raises any
+    exception from the producer. Closing the generator (client disconnect)
+    tells the producer to stop.
+
+    With ``coalesce`` set to a dict key, consecutive items carrying that key
+    within SSE_COALESCE_SECONDS are merged into the first one, their string
+    values concatenated.
+    """
+    items: queue.Queue = queue.Queue()
+    stop = threading.Event()
+
+    def produce() -> None:
+        try:
+            for item in make_iterator():
+                if stop.is_set():
+                    break
+                items.put(item)
+        except BaseException as exc:  # forwarded and re-raised in the consumer
+            items.put(_StreamFailure(exc))
+        finally:
+            items.put(_STREAM_DONE)
+
+    future = _GPT_POOL.submit(produce)
+    deadline = time.monotonic() + timeout
+    pending = None  # An item read while coalescing that belongs to the next frame
+    try:
+        while True:
+            if pending is not None:
+                item, pending = pending, None
+            else:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"AI response exceeded {timeout}s")
+                try:
+                    item = items.get(timeout=min(heartbeat, remaining))
+                except queue.Empty:
+                    yield None
+                    continue
+            if item is _STREAM_DONE:
+                return
+            if isinstance(item, _StreamFailure):
+                raise item.error
+            if coalesce is not None and isinstance(item, dict) and coalesce in item:
+                parts = [item[coalesce]]
+                size = len(parts[0])
+                flush_at = time.monotonic() + SSE_COALESCE_SECONDS
+                while size < SSE_COALESCE_MAX_CHARS:
+                    wait = min(flush_at, deadline) - time.monotonic()
+                    if wait <= 0:
+                        break
+                    try:
+                        nxt = items.get(timeout=wait)
+                    except queue.Empty:
+                        break
+                    if not (isinstance(nxt, dict) and coalesce in nxt):
+                        pending = nxt
+                        break
+                    parts.append(nxt[coalesce])
+                    size += len(nxt[coalesce])
+                if len(parts) > 1:
+                    item = {**item, coalesce: ''.join(parts)}
+            yield item
+    finally:
+        stop.set()
+        future.cancel()
+
+# ===== End shared GPT pool =====
+
 # Log environment info (fallback if route handler utility unavailable)
 if log_environment_info:
     log_environment_info(logger, backend_dir)
@@ -96,11 +223,49 @@ STATIC_ROOTS = [
     os.path.join(BASE_DIR, "frontend", "dist"),
     os.path.join(BASE_DIR, "static"),
 ]
+# Usually only backend/static ships; drop the others so debug-mode lookups and
+# startup scans don't probe directories that aren't there (restart after a
+# first frontend build creates one)
+STATIC_ROOTS = [root for root in STATIC_ROOTS if os.path.isdir(root)]
+# Static root -> its assets/ folder, joined once instead of per /assets/ request
+_ASSETS_FOLDERS = {root: os.path.join(root, "assets") for root in STATIC_ROOTS}
 
 # Local utilities
 from backend.visit_counter import get_counts, increment_visit, normalize_path
+from backend.json_utils import ORJSONProvider, dumps as json_dumps, json_response, parse_json_body
+from backend.text_utils import b64encode_text, is_thai_text, text_digest
+from backend.time_utils import iso_now
 
 app = Flask(__name__)
+# jsonify() encodes with orjson: raw UTF-8 Thai instead of \uXXXX escapes
+app.json = ORJSONProvider(app)
+
+# Behind nginx/Apache, hand on-disk static files to the proxy via X-Sendfile
+# instead of streaming them through the worker. Off by default: without a
+# proxy that understands the header, clients would get an empty body. Without
+# it, gunicorn still serves send_file responses with os.sendfile() through
+# wsgi.file_wrapper.
+app.use_x_sendfile = os.getenv('USE_X_SENDFILE', '0').lower() in ('1', 'true', 'yes')
+
+# Hard cap on any request body; the largest legitimate one is a 25MB audio
+# upload to /api/speech-to-text (plus multipart overhead)
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_UPLOAD_BYTES', str(26 * 1024 * 1024)))
+# JSON payloads (chat messages, feedback, TTS text) are a few KB at most
+MAX_JSON_BODY_BYTES = int(os.getenv('MAX_JSON_BODY_BYTES', str(64 * 1024)))
+# OpenAI Whisper rejects audio uploads larger than this
+WHISPER_MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+
+
+@app.before_request
+def reject_oversized_json():
+    """Refuse large JSON bodies before any view buffers and parses them."""
+    if request.content_length and request.content_length > MAX_JSON_BODY_BYTES and request.is_json:
+        return json_response({'success': False, 'error': 'Request body too large'}, 413)
+
+
+@app.errorhandler(413)
+def request_entity_too_large(error):
+    return json_response({'success': False, 'error': 'Request body too large'}, 413)
 
 # Configure CORS with security restrictions
 allowed_origins = os.getenv("ALLOWED_ORIGINS", "http://localhost:5173,http://localhost:3000,http://localhost:8000,http://localhost:8080,http://127.0.0.1:5173,http://127.0.0.1:3000,http://127.0.0.1:8000,http://127.0.0.1:8080").split(",")
@@ -114,82 +279,118 @@ CORS(app, resources={
         "allow_headers": ["Content-Type", "Authorization", "Cache-Control", "Pragma", "Accept", "Accept-Language", "Accept-Encoding", "Origin", "X-Requested-With"],
         "expose_headers": ["Content-Type", "Content-Length"],
         "supports_credentials": True,
-        "max_age": 3600
+        # Let browsers reuse the preflight for a day (Chromium caps it at 2h)
+        # instead of re-sending OPTIONS before each /api/messages/stream POST
+        "max_age": 86400
     }
 }, supports_credentials=True)
 
+# Security headers for every response. Also applied to the files WhiteNoise
+# answers before Flask runs (see _whitenoise_security_headers).
+SECURITY_HEADERS = {
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "SAMEORIGIN",
+    "X-XSS-Protection": "1; mode=block",
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    "Permissions-Policy": "geolocation=(self), microphone=*, camera=*",
+}
+# Only add HSTS in production
+if os.getenv("FLASK_ENV") == "production":
+    SECURITY_HEADERS["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+
+
 # Add security headers
 @app.after_request
 def set_security_headers(response):
     """Add security headers to all responses."""
-    response.headers["X-Content-Type-Options"] = "nosniff"
-    response.headers["X-Frame-Options"] = "SAMEORIGIN"
-    response.headers["X-XSS-Protection"] = "1; mode=block"
-    response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-    response.headers["Permissions-Policy"] = "geolocation=(self), microphone=*, camera=*"
-    # Only add HSTS in production
-    if os.getenv("FLASK_ENV") == "production":
-        response.headers["Strict-Transport-Security"] = "max-age=31536000; includeSubDomains"
+    response.headers.update(SECURITY_HEADERS)
     return response
 
-# Initialize extensions (DB, JWT, Migration) and register API blueprints
-try:
-    from backend.extensions import init_extensions
-    from backend.api import register_api_blueprints
-    init_extensions(app)
-    register_api_blueprints(app)
-    logger.info("✓ Extensions and API blueprints initialized successfully")
-except Exception as e:
-    logger.warning(f"✗ Failed to initialize extensions: {e}")
-    # Try to register tracking blueprint separately even if extensions fail
-    try:
-        from backend.api.tracking import tracking_api_bp
-        app.register_blueprint(tracking_api_bp)
-        logger.info("✓ Tracking API blueprint registered separately")
-    except Exception as tracking_err:
-        logger.warning(f"✗ Failed to register tracking blueprint: {tracking_err}")
-
 # ===== iOS FIX: Request Deduplication & Singleton Pattern =====
 import uuid
 import time
-import hashlib
 
-_CHATBOT_INSTANCE = None  # Singleton to prevent multiple DB loads
-_ACTIVE_REQUESTS = {}     # Track active requests to prevent duplicates
-_INTENT_CACHE = {}        # Cache intent classifications
-_MATCH_CACHE = {}         # Cache matched data
+# Insertion-ordered caches: the oldest entry is always at the front, so expiry
+# and size bounds are enforced on insert by popping from the left, O(1)
+# amortized, with no periodic sweep.
+_ACTIVE_REQUESTS: OrderedDict = OrderedDict()  # Track active requests to prevent duplicates
+_ACTIVE_REQUESTS_LOCK = threading.Lock()
+_DUPLICATE_WINDOW_SECONDS = 5  # A retry of the same request_id within this window is rejected
+_ACTIVE_REQUEST_MAX_AGE = 120  # Claims whose stream never ran are dropped after this
+_INTENT_CACHE: OrderedDict = OrderedDict()  # Cache intent classifications
+_MATCH_CACHE: OrderedDict = OrderedDict()   # Cache matched data
 _CACHE_TTL = 30          # Cache TTL in seconds
-_CLEANUP_THRESHOLD = 100  # Cleanup caches when they exceed this size
+_CACHE_MAX_ENTRIES = 256  # LRU bound per cache
+
+def _cache_get(cache: OrderedDict, key: tuple[str, int]) -> dict | None:
+    """Return a live cache entry, dropping it lazily if its TTL has passed."""
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    if time.time() - entry['timestamp'] >= _CACHE_TTL:
+        cache.pop(key, None)
+        return None
+    try:
+        cache.move_to_end(key)
+    except KeyError:
+        pass  # Evicted by a concurrent insert; the entry we hold is still valid
+    return entry
+
+
+def _cache_set(cache: OrderedDict, key: tuple[str, int], **fields) -> None:
+    """Insert ``fields`` under ``key``, evicting expired and least recently used entries."""
+    now = time.time()
+    fields['timestamp'] = now
+    cache[key] = fields
+    cache.move_to_end(key)
+    while cache:
+        oldest_key, oldest = next(iter(cache.items()))
+        if len(cache) <= _CACHE_MAX_ENTRIES and now - oldest['timestamp'] < _CACHE_TTL:
+            break
+        cache.pop(oldest_key, None)
+
+
+def _claim_request(request_id: str) -> float | None:
+    """Atomically mark ``request_id`` as in flight (SET NX semantics).
+
+    Returns None when claimed, or the seconds since the existing claim when the
+    same id is already running and inside the duplicate window. The check and
+    the insert happen under one lock so two concurrent retries can't both pass.
+    """
+    now = time.time()
+    with _ACTIVE_REQUESTS_LOCK:
+        started = _ACTIVE_REQUESTS.get(request_id)
+        if started is not None and now - started < _DUPLICATE_WINDOW_SECONDS:
+            return now - started
+        _ACTIVE_REQUESTS[request_id] = now
+        _ACTIVE_REQUESTS.move_to_end(request_id)
+        # Drop stale claims (streams that were never iterated never release)
+        while _ACTIVE_REQUESTS:
+            oldest_id, oldest_started = next(iter(_ACTIVE_REQUESTS.items()))
+            if now - oldest_started < _ACTIVE_REQUEST_MAX_AGE:
+                break
+            del _ACTIVE_REQUESTS[oldest_id]
+    return None
 
-def cleanup_caches():
-    """Periodically clean up old cache entries"""
-    global _ACTIVE_REQUESTS, _INTENT_CACHE, _MATCH_CACHE
-    current_time = time.time()
-    
-    # Clean active requests older than 120 seconds
-    _ACTIVE_REQUESTS = {k: v for k, v in _ACTIVE_REQUESTS.items() 
-                       if current_time - v < 120}
-    
-    # Clean intent cache
-    _INTENT_CACHE = {k: v for k, v in _INTENT_CACHE.items() 
-                    if current_time - v['timestamp'] < _CACHE_TTL}
-    
-    # Clean match cache
-    _MATCH_CACHE = {k: v for k, v in _MATCH_CACHE.items() 
-                   if current_time - v['timestamp'] < _CACHE_TTL}
+
+def _release_request(request_id: str) -> bool:
+    """Drop the in-flight claim for ``request_id``; True if one was held."""
+    return _ACTIVE_REQUESTS.pop(request_id, None) is not None
 
 def get_chatbot():
-    """Get or create singleton chatbot instance"""
-    global _CHATBOT_INSTANCE
-    if _CHATBOT_INSTANCE is None:
-        try:
-            from backend.chat import TravelChatbot
-            _CHATBOT_INSTANCE = TravelChatbot()
-            logger.info("✓ Chatbot singleton initialized")
-        except Exception as e:
-            logger.error(f"✗ Failed to initialize chatbot singleton: {e}")
-            return None
-    return _CHATBOT_INSTANCE
+    """Return backend.chat's process-wide TravelChatbot, or None if it can't be built.
+
+    The streaming endpoint and the chat_with_bot/get_chat_response helpers all
+    share this one instance, so the DB load happens once per worker.
+    """
+    chat = _load_chat_module()
+    if chat is None:
+        return None
+    try:
+        return chat.get_chatbot()
+    except Exception as e:
+        logger.error(f"✗ Failed to initialize chatbot singleton: {e}")
+        return None
 
 # ===== End iOS Fix =====
 
@@ -211,14 +412,16 @@ def validate_message_input(message: str) -> tuple[bool, str]:
     
     return True, ""
 
+_USER_ID_DISALLOWED = re.compile(r'[^a-zA-Z0-9_-]')
+
+
 def sanitize_user_id(user_id: str) -> str:
     """Sanitize user ID to prevent injection attacks"""
     if not user_id or not isinstance(user_id, str):
         return "default"
     
     # Remove any non-alphanumeric characters except hyphens and underscores
-    import re
-    sanitized = re.sub(r'[^a-zA-Z0-9_-]', '', user_id)
+    sanitized = _USER_ID_DISALLOWED.sub('', user_id)
     
     if not sanitized or len(sanitized) > 100:
         return "default"
@@ -227,56 +430,151 @@ def sanitize_user_id(user_id: str) -> str:
 
 # ===== End Input Validation =====
 
-# JWT Setup for authentication
-try:
-    from flask_jwt_extended import JWTManager
-    app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'nong-platoo-secret-key')
-    jwt = JWTManager(app)
-    logger.info("✓ JWT initialized successfully")
-except ImportError:
-    logger.warning("✗ flask_jwt_extended not installed - JWT auth disabled")
-except Exception as e:
-    logger.error(f"✗ JWT initialization failed: {e}")
-
-# Register tracking routes blueprint
-try:
-    from backend.routes import tracking_bp
-    app.register_blueprint(tracking_bp)
-    logger.info("✓ Tracking routes registered successfully")
-except ImportError:
-    logger.warning("✗ Tracking routes not available")
-except Exception as e:
-    logger.error(f"✗ Failed to register tracking routes: {e}")
+# ===== One-time app initialization =====
+# Extension setup and blueprint registration, run once per process. Gunicorn
+# imports app.py in each worker after fork (no preload_app: gevent must patch
+# the stdlib before any of this opens sockets or starts threads), so this runs
+# once per worker; _initialize() is idempotent if called again.
+_INITIALIZED = False
 
-try:
 
-    # Attempt to import chat utilities from either root or the 'backend' package.
-    from backend.chat import chat_with_bot, chat_with_bot_stream, get_chat_response
-    logger.info("✓ Chat module imported successfully")
-except Exception as e:
-    # Fallback definitions to prevent NameError if imports fail. These will
-    # raise a runtime error when used, making the failure explicit.
-    logger.error(f"✗ Failed to import chat module: {e}")
-    def chat_with_bot(message: str, user_id: str = "default") -> str:
-        raise RuntimeError(f"Chat module unavailable: {e}")
-    
-    def chat_with_bot_stream(message: str, user_id: str = "default"):
-        yield {"type": "error", "message": f"Chat module unavailable: {e}"}
+def _initialize(app: Flask) -> None:
+    """Initialize extensions, JWT and blueprints on ``app`` (first call only)."""
+    global _INITIALIZED
+    if _INITIALIZED:
+        return
+    _INITIALIZED = True
+
+    # Extensions (DB, JWT, Migration) and API blueprints
+    try:
+        from backend.extensions import init_extensions
+        from backend.api import register_api_blueprints
+        init_extensions(app)
+        register_api_blueprints(app)
+        logger.info("✓ Extensions and API blueprints initialized successfully")
+    except Exception as e:
+        logger.warning(f"✗ Failed to initialize extensions: {e}")
+        # Try to register tracking blueprint separately even if extensions fail
+        try:
+            from backend.api.tracking import tracking_api_bp
+            app.register_blueprint(tracking_api_bp)
+            logger.info("✓ Tracking API blueprint registered separately")
+        except Exception as tracking_err:
+            logger.warning(f"✗ Failed to register tracking blueprint: {tracking_err}")
+        # /api/feedback and /api/feedback/stats live only in the feedback
+        # blueprint; keep them up even if extensions fail
+        try:
+            from backend.api.feedback import feedback_api_bp
+            app.register_blueprint(feedback_api_bp)
+            logger.info("✓ Feedback API blueprint registered separately")
+        except Exception as feedback_err:
+            logger.warning(f"✗ Failed to register feedback blueprint: {feedback_err}")
 
-    def get_chat_response(message: str, user_id: str = "default") -> dict:
+    # JWT Setup for authentication
+    try:
+        from flask_jwt_extended import JWTManager
+        app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'nong-platoo-secret-key')
+        JWTManager(app)
+        logger.info("✓ JWT initialized successfully")
+    except ImportError:
+        logger.warning("✗ flask_jwt_extended not installed - JWT auth disabled")
+    except Exception as e:
+        logger.error(f"✗ JWT initialization failed: {e}")
+
+    # Register tracking routes blueprint
+    try:
+        from backend.routes import tracking_bp
+        app.register_blueprint(tracking_bp)
+        logger.info("✓ Tracking routes registered successfully")
+    except ImportError:
+        logger.warning("✗ Tracking routes not available")
+    except Exception as e:
+        logger.error(f"✗ Failed to register tracking routes: {e}")
+
+
+_initialize(app)
+
+# ===== End one-time app initialization =====
+
+# ===== Lazy chat module =====
+# backend.chat pulls in OpenAI, the DB search layer and the semantic matchers.
+# Import it on the first chat request instead of at startup so health checks and
+# static files are served as soon as the worker boots. (A PEP 562 module
+# __getattr__ would not help here: it only fires for attribute access from other
+# modules, never for this module's own global lookups.)
+_CHAT_MODULE = None
+_CHAT_IMPORT_ERROR: str | None = None
+
+
+def _load_chat_module():
+    """Return backend.chat, importing it once; None if the import failed."""
+    global _CHAT_MODULE, _CHAT_IMPORT_ERROR
+    if _CHAT_MODULE is None and _CHAT_IMPORT_ERROR is None:
+        try:
+            import backend.chat as chat_module
+            _CHAT_MODULE = chat_module
+            logger.info("✓ Chat module imported successfully")
+        except Exception as e:
+            _CHAT_IMPORT_ERROR = str(e)
+            logger.error(f"✗ Failed to import chat module: {e}")
+    return _CHAT_MODULE
+
+
+def chat_with_bot(message: str, user_id: str = "default") -> str:
+    chat = _load_chat_module()
+    if chat is None:
+        raise RuntimeError(f"Chat module unavailable: {_CHAT_IMPORT_ERROR}")
+    return chat.chat_with_bot(message, user_id)
+
+
+# iOS clients re-send the same message on flaky connections; answer a repeat
+# within _CACHE_TTL from memory instead of another LLM round trip
+_CHAT_REPLY_CACHE: OrderedDict = OrderedDict()
+
+
+def chat_with_bot_cached(message: str, user_id: str = "default") -> str:
+    """chat_with_bot, memoized per (user_id, message) for _CACHE_TTL seconds."""
+    key = (user_id, text_digest(message))
+    cached = _cache_get(_CHAT_REPLY_CACHE, key)
+    if cached is not None:
+        return cached['data']
+    reply = chat_with_bot(message, user_id)  # Errors propagate and are not cached
+    _cache_set(_CHAT_REPLY_CACHE, key, data=reply)
+    return reply
+
+
+def chat_with_bot_stream(message: str, user_id: str = "default"):
+    chat = _load_chat_module()
+    if chat is None:
+        yield {"type": "error", "message": f"Chat module unavailable: {_CHAT_IMPORT_ERROR}"}
+        return
+    yield from chat.chat_with_bot_stream(message, user_id)
+
+
+def get_chat_response(message: str, user_id: str = "default") -> dict:
+    chat = _load_chat_module()
+    if chat is None:
         return {
             'response': '',
             'structured_data': [],
             'language': 'th',
             'intent': None,
             'source': 'error',
-            'error': f'Chat module unavailable: {e}',
+            'error': f'Chat module unavailable: {_CHAT_IMPORT_ERROR}',
         }
+    return chat.get_chat_response(message, user_id)
+
+# ===== End lazy chat module =====
 
 try:
     # Import database initialization helper
-    from backend.db import init_db
+    from backend.db import init_db, get_scoped_session, remove_scoped_session
     logger.info("✓ Database module imported successfully")
+
+    @app.teardown_appcontext
+    def _remove_db_session(exc: BaseException | None) -> None:
+        """Release the request's scoped DB session back to the pool."""
+        remove_scoped_session()
 except Exception as db_import_error:
     # Provide a noop init_db to avoid UnboundLocalError; it will log the issue.
     logger.error(f"✗ Failed to import db module: {db_import_error}")
@@ -293,165 +591,450 @@ FIREBASE_ENV_MAP = {
     'appId': 'FIREBASE_APP_ID',
     'databaseURL': 'FIREBASE_DATABASE_URL',
 }
-def _find_static_file(filename: str) -> tuple[str, str] | None:
-    """Return (folder, filename) for the first static folder containing the file."""
+# Build-time compressed siblings (e.g. `python -m whitenoise.compress`, or
+# `brotli -q 11` / `gzip -9` over dist/assets) served for large on-disk assets,
+# in order of preference
+_PRECOMPRESSED_SIBLINGS = (('br', '.br'), ('gzip', '.gz'))
+_PRECOMPRESSED_SUFFIXES = tuple(suffix for _, suffix in _PRECOMPRESSED_SIBLINGS)
+
+
+def _scan_static_roots() -> tuple[dict[str, str], dict[str, str]]:
+    """Map every file under STATIC_ROOTS (relative URL path) to the first root holding it.
+
+    Returns (files, siblings): ``.br``/``.gz`` copies of another indexed file
+    go to ``siblings`` only, so they are never served (or cached) as plain
+    files with the wrong Content-Type and no Content-Encoding.
+
+    Uses os.scandir, whose directory entries already carry the file type, so
+    building the index costs one readdir per directory rather than a stat()
+    per file.
+    """
+    index: dict[str, str] = {}
+
+    def walk(root: str, directory: str, prefix: str) -> None:
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            return
+        with entries:
+            for entry in entries:
+                rel_path = prefix + entry.name
+                if entry.is_dir():
+                    walk(root, entry.path, rel_path + '/')
+                elif entry.is_file():
+                    index.setdefault(rel_path, root)  # Earlier roots take priority
+
+    for root in STATIC_ROOTS:
+        walk(root, root, '')
+    siblings: dict[str, str] = {}
+    for rel_path in list(index):
+        if rel_path.endswith(_PRECOMPRESSED_SUFFIXES) and rel_path.rsplit('.', 1)[0] in index:
+            siblings[rel_path] = index.pop(rel_path)
+    return index, siblings
+
+
+# The bundle only changes on deploy: resolve every static path once at startup
+_STATIC_INDEX, _STATIC_SIBLINGS = _scan_static_roots()
+
+
+def _stat_static_root(path: str) -> str | None:
+    """Return the first static root containing ``path``, checking the disk.
+
+    ``path`` comes straight from the URL, so traversal attempts (``../``,
+    absolute paths) are rejected before any stat() is spent on them.
+    """
     for folder in STATIC_ROOTS:
-        candidate = os.path.join(folder, filename)
-        if os.path.isfile(candidate):
-            return folder, filename
+        full_path = safe_join(folder, path)
+        if full_path is None:
+            return None
+        if os.path.isfile(full_path):
+            return folder
     return None
 
 
+def _lookup_static_root(path: str) -> str | None:
+    """Static root for ``path`` from the startup index; from disk in debug so rebuilt files are picked up."""
+    if app.debug:
+        return _stat_static_root(path)
+    return _STATIC_INDEX.get(path)
+
+
+def _find_static_file(filename: str) -> tuple[str, str] | None:
+    """Return (folder, filename) for the first static folder containing the file."""
+    folder = _lookup_static_root(filename)
+    if folder is None:
+        return None
+    return folder, filename
+
+
 def _find_asset_file(path: str) -> tuple[str, str] | None:
     """Return (folder, path) for the first assets folder containing the file."""
-    for folder in STATIC_ROOTS:
-        candidate = os.path.join(folder, "assets", path)
-        if os.path.isfile(candidate):
-            return os.path.join(folder, "assets"), path
-    return None
+    folder = _lookup_static_root(f"assets/{path}")
+    if folder is None:
+        return None
+    return _ASSETS_FOLDERS[folder], path
+
+
+def _asset_sibling_root(path: str) -> str | None:
+    """Static root holding the precompressed sibling ``assets/<path>`` (e.g. ``x.js.br``)."""
+    if app.debug:
+        return _stat_static_root(f"assets/{path}")
+    return _STATIC_SIBLINGS.get(f"assets/{path}")
+
+
+# ===== In-memory static cache =====
+# The SPA bundle only changes on deploy, so read every static file once at
+# startup and serve it from memory with a content-hash ETag. Compressible files
+# are also gzipped once here so requests never pay for compression. Files larger
+# than STATIC_CACHE_MAX_BYTES stay on disk and go through _send_static.
+STATIC_CACHE_MAX_BYTES = int(os.getenv("STATIC_CACHE_MAX_BYTES", str(2 * 1024 * 1024)))
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Vite appends an 8-char base64url content hash: index-CgXFdBVE.js
+_ASSET_HASH_RE = re.compile(r'-([A-Za-z0-9_-]{8})\.[A-Za-z0-9]+$')
+
+# Formats that are already compressed; gzipping them only burns CPU
+_PRECOMPRESSED_TYPE_PREFIXES = ('image/', 'font/', 'audio/', 'video/', 'application/octet-stream')
+
+
+def _is_compressible(content_type: str) -> bool:
+    return content_type == 'image/svg+xml' or not content_type.startswith(_PRECOMPRESSED_TYPE_PREFIXES)
+
+
+def _build_static_cache() -> dict[str, tuple[bytes, bytes | None, str, str, str | None]]:
+    """Map relative URL path -> (raw, gz, content_type, etag_raw, etag_gz) for all static roots."""
+    cache: dict[str, tuple[bytes, bytes | None, str, str, str | None]] = {}
+    # _STATIC_INDEX already holds only the winning root for each path
+    for rel_path, root in _STATIC_INDEX.items():
+        full_path = os.path.join(root, rel_path)
+        try:
+            if os.path.getsize(full_path) > STATIC_CACHE_MAX_BYTES:
+                continue
+            with open(full_path, 'rb') as f:
+                body = f.read()
+        except OSError as e:
+            logger.warning(f"Static cache skipped {full_path}: {e}")
+            continue
+        content_type = mimetypes.guess_type(rel_path)[0] or 'application/octet-stream'
+        etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+        gz_body = gz_etag = None
+        if _is_compressible(content_type):
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                # Distinct ETag so caches never mix up the two encodings
+                gz_body, gz_etag = compressed, f"{etag}-gzip"
+        cache[rel_path] = (body, gz_body, content_type, etag, gz_etag)
+    return cache
+
+
+STATIC_WHITENOISE = os.getenv('STATIC_WHITENOISE', '1').lower() in ('1', 'true', 'yes')
+_WHITENOISE_ACTIVE = WhiteNoise is not None and STATIC_WHITENOISE
+
+if _WHITENOISE_ACTIVE:
+    # WhiteNoise answers every file found at startup before Flask runs, so
+    # reading and gzipping the whole tree here would be wasted boot time
+    STATIC_CACHE = {}
+else:
+    STATIC_CACHE = _build_static_cache()
+    logger.info(f"✓ Static cache loaded: {len(STATIC_CACHE)} files")
+
+# The SPA shell is served for / and every client-side route; resolve it once
+_INDEX_LOCATION = _find_static_file('index.html')
+if _INDEX_LOCATION is None:
+    logger.warning("index.html not found in any static root; / will return 404")
+
+
+def _index_location() -> tuple[str, str] | None:
+    """(folder, 'index.html') resolved at startup; looked up again in debug mode."""
+    if app.debug:
+        return _find_static_file('index.html')
+    return _INDEX_LOCATION
+
+
+def _serve_cached(path: str) -> Response | None:
+    """Serve a static file from STATIC_CACHE, or return None if it is not cached."""
+    if app.debug:
+        return None  # Serve from disk so a frontend rebuild shows up without a restart
+    entry = STATIC_CACHE.get(path)
+    if entry is None:
+        return None
+    body, gz_body, content_type, etag, gz_etag = entry
+    use_gzip = gz_body is not None and request.accept_encodings.quality('gzip') > 0
+    if use_gzip:
+        body, etag = gz_body, gz_etag
+
+    if path.startswith('assets/'):
+        # Vite emits content-hashed filenames, so these never change in place
+        cache_control = IMMUTABLE_CACHE_CONTROL
+    else:
+        cache_control = 'no-cache'
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype=content_type)
+        if use_gzip:
+            response.headers['Content-Encoding'] = 'gzip'
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    if gz_body is not None:
+        response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+
+def _send_static(folder: str, path: str, **kwargs) -> Response:
+    """Send a file that _lookup_static_root already resolved under ``folder``.
+
+    Outside debug every resolved path is a key of _STATIC_INDEX, i.e. a file
+    found by the startup scan, so the safe_join + isfile that
+    send_from_directory repeats per request are skipped and send_file goes
+    straight to the open (handed to wsgi.file_wrapper, so sendfile under
+    gunicorn). Debug lookups come from the raw URL, so they keep the checks.
+    """
+    if app.debug:
+        return send_from_directory(folder, path, **kwargs)
+    return send_file(os.path.join(folder, path), **kwargs)
+
+
+def _send_immutable_asset(folder: str, path: str) -> Response:
+    """_send_static for /assets/ files that are too large for STATIC_CACHE.
+
+    The default ETag is derived from mtime, which changes on every deploy even
+    when the bytes don't. Use the hash token Vite already put in the filename.
+    A precompressed .br/.gz sibling is sent instead when the client accepts it.
+    """
+    encoding = None
+    for candidate, suffix in _PRECOMPRESSED_SIBLINGS:
+        sibling_root = _asset_sibling_root(path + suffix)
+        if request.accept_encodings.quality(candidate) > 0 and sibling_root is not None and _ASSETS_FOLDERS[sibling_root] == folder:
+            encoding = candidate
+            break
+
+    if encoding is None:
+        response = _send_static(folder, path, etag=False)
+    else:
+        mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        response = _send_static(folder, path + suffix, mimetype=mimetype, etag=False)
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response.headers.setdefault('Vary', 'Accept-Encoding')
+    match = _ASSET_HASH_RE.search(path)
+    if match:
+        # Distinct ETag per encoding so caches never mix up the variants
+        response.set_etag(match.group(1) if encoding is None else f"{match.group(1)}-{encoding}")
+        response.make_conditional(request)
+    return response
+
+# ===== End In-memory static cache =====
+
+# ===== WhiteNoise =====
+# When whitenoise is installed, built files are answered in front of Flask's
+# routing: headers, ETags and any precompressed .gz/.br siblings are prepared
+# once at startup, and bodies go out through wsgi.file_wrapper (sendfile under
+# gunicorn). Paths it doesn't know (API calls, SPA client routes) fall through
+# to the Flask routes below, which keep serving everything if it is missing.
+# STATIC_WHITENOISE / _WHITENOISE_ACTIVE are defined with the static cache above.
+
+
+def _is_immutable_asset(_path: str, url: str) -> bool:
+    """Vite's content-hashed /assets/ files can be cached forever."""
+    return url.startswith('/assets/') and _ASSET_HASH_RE.search(url) is not None
+
+
+def _whitenoise_security_headers(headers, _path: str, _url: str) -> None:
+    """WhiteNoise responses bypass Flask's after_request hooks; add the same headers."""
+    for name, value in SECURITY_HEADERS.items():
+        headers[name] = value
+
+
+if _WHITENOISE_ACTIVE:
+    app.wsgi_app = WhiteNoise(
+        app.wsgi_app,
+        autorefresh=app.debug,  # Rescan on each request only while developing
+        index_file=True,        # / -> index.html
+        max_age=0,              # index.html and other unhashed files revalidate
+        immutable_file_test=_is_immutable_asset,
+        add_headers_function=_whitenoise_security_headers,
+    )
+    # Later add_files calls win on a clash, so add in reverse to keep the
+    # first root taking priority, as in _STATIC_INDEX
+    for _root in reversed(STATIC_ROOTS):
+        app.wsgi_app.add_files(_root, prefix='')
+    logger.info("✓ Static files served by WhiteNoise")
+
+# ===== End WhiteNoise =====
 
 @app.route('/')
 def index():
-    found = _find_static_file('index.html')
+    cached = _serve_cached('index.html')
+    if cached is not None:
+        return cached
+    found = _index_location()
     if found:
         folder, fname = found
-        return send_from_directory(folder, 'index.html')
+        return _send_static(folder, 'index.html')
     abort(404)
     
+# Liveness probes hit this at high frequency; the body never changes
+_HEALTH_BODY = json_dumps({'status': 'healthy', 'service': 'NongPlatoo.Ai'})
+
+
 @app.route('/health', methods=['GET'])
 def health():
     """Simple health check endpoint."""
-    return jsonify({'status': 'healthy', 'service': 'NongPlatoo.Ai'}), 200
+    return Response(_HEALTH_BODY, status=200, mimetype='application/json')
 
 @app.route('/assets/<path:path>')
 def send_assets(path):
+    cached = _serve_cached(f'assets/{path}')
+    if cached is not None:
+        return cached
     found = _find_asset_file(path)
     if found:
         folder, fname = found
-        return send_from_directory(folder, path)
+        return _send_immutable_asset(folder, path)
     abort(404)
 
 @app.route('/api/query', methods=['POST'])
 def api_query():
     if handle_api_query:
         response_data, status_code = handle_api_query(get_chat_response)
-        return jsonify(response_data), status_code
+        return json_response(response_data, status_code)
     
     # Fallback implementation
+    data = parse_json_body()
+    if not isinstance(data, dict) or 'message' not in data:
+        return json_response({'error': 'Message is required'}, 400)
+
+    user_message = data['message']
+    user_id = data.get('user_id', 'default')
+
+    # Validate and sanitize inputs
+    is_valid, error_msg = validate_message_input(user_message)
+    if not is_valid:
+        return json_response({'error': error_msg}, 400)
+
+    user_id = sanitize_user_id(user_id)
+    user_message = user_message.strip()
+
     try:
-        data = request.get_json()
-        if not data or 'message' not in data:
-            return jsonify({'error': 'Message is required'}), 400
-        
-        user_message = data['message']
-        user_id = data.get('user_id', 'default')
-        
-        # Validate and sanitize inputs
-        is_valid, error_msg = validate_message_input(user_message)
-        if not is_valid:
-            return jsonify({'error': error_msg}), 400
-        
-        user_id = sanitize_user_id(user_id)
-        user_message = user_message.strip()
-        
         result = get_chat_response(user_message, user_id)
-        
-        return jsonify({
-            'success': True,
-            'response': result['response'],
-            'structured_data': result.get('structured_data', []),
-            'language': result.get('language', 'th'),
-            'intent': result.get('intent'),
-            'source': result.get('source'),
-            'tokens_used': result.get('tokens_used'),
-            'timestamp': datetime.datetime.now().isoformat()
-        })
-    except Exception as e:
+        response_text = result['response']
+    except (KeyError, ValueError, RuntimeError) as e:
         logger.error(f"[ERROR] /api/query failed: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
+    except Exception as e:
+        logger.exception("/api/query failed")
+        return json_response({'error': str(e)}, 500)
+
+    return json_response({
+        'success': True,
+        'response': response_text,
+        'structured_data': result.get('structured_data', []),
+        'language': result.get('language', 'th'),
+        'intent': result.get('intent'),
+        'source': result.get('source'),
+        'tokens_used': result.get('tokens_used'),
+        'timestamp': iso_now()
+    })
+
+
+def _sse(payload: dict) -> bytes:
+    """Frame one Server-Sent Events message (orjson-encoded UTF-8 bytes)."""
+    return b"data: %b\n\n" % json_dumps(payload)
+
+
+# Constant frame, encoded once rather than per idle interval
+_SSE_HEARTBEAT = _sse({'type': 'heartbeat'})
 
 
 @app.route('/api/chat', methods=['POST'])
 def api_chat():
     """Streaming chat endpoint - returns SSE stream."""
-    try:
-        data = request.get_json()
-        if not data or 'message' not in data:
-            return jsonify({'error': 'Message is required'}), 400
-        
-        user_message = data['message']
-        user_id = data.get('user_id', 'default')
-        
-        def generate():
-            """Generator function for SSE streaming."""
-            try:
-                for chunk in chat_with_bot_stream(user_message, user_id):
-                    yield "data: " + json.dumps(chunk, ensure_ascii=False) + "\n\n"
-            except Exception as e:
-                logger.exception("Error in chat streaming")
-                yield "data: " + json.dumps({'type': 'error', 'message': str(e)}, ensure_ascii=False) + "\n\n"
-        
-        return Response(generate(), mimetype='text/event-stream')
-    except Exception as e:
-        logger.error(f"[ERROR] /api/chat failed: {e}")
-        return jsonify({'error': str(e)}), 500
+    data = parse_json_body()
+    if not isinstance(data, dict) or 'message' not in data:
+        return json_response({'error': 'Message is required'}, 400)
+
+    user_message = data['message']
+    user_id = data.get('user_id', 'default')
+
+    def generate():
+        """Generator function for SSE streaming."""
+        try:
+            for chunk in _iter_in_pool(lambda: chat_with_bot_stream(user_message, user_id)):
+                yield _SSE_HEARTBEAT if chunk is None else _sse(chunk)
+        except Exception as e:
+            logger.exception("Error in chat streaming")
+            yield _sse({'type': 'error', 'message': str(e)})
+
+    return Response(generate(), mimetype='text/event-stream')
 
 
 @app.route('/api/chat/sync', methods=['POST'])
 def api_chat_sync():
     """Non-streaming chat endpoint for backward compatibility - returns complete JSON response."""
     if handle_api_chat:
-        response_data, status_code = handle_api_chat(chat_with_bot)
-        return jsonify(response_data), status_code
+        response_data, status_code = handle_api_chat(chat_with_bot_cached)
+        return json_response(response_data, status_code)
     
     # Fallback implementation
+    data = parse_json_body()
+    if not isinstance(data, dict) or 'message' not in data:
+        return json_response({'error': 'Message is required'}, 400)
+
+    user_message = data['message']
+    user_id = data.get('user_id', 'default')
     try:
-        data = request.get_json()
-        if not data or 'message' not in data:
-            return jsonify({'error': 'Message is required'}), 400
-        
-        user_message = data['message']
-        user_id = data.get('user_id', 'default')
-        bot_response = chat_with_bot(user_message, user_id)
-        
-        return jsonify({
-            'success': True,
-            'response': bot_response,
-            'timestamp': datetime.datetime.now().isoformat()
-        })
+        bot_response = chat_with_bot_cached(user_message, user_id)
+    except (KeyError, ValueError, RuntimeError) as e:
+        logger.error(f"[ERROR] /api/chat/sync failed: {e}")
+        return json_response({'error': str(e)}, 500)
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        logger.exception("/api/chat/sync failed")
+        return json_response({'error': str(e)}, 500)
+
+    return json_response({
+        'success': True,
+        'response': bot_response,
+        'timestamp': iso_now()
+    })
 
 
 @app.route('/api/visits', methods=['GET', 'POST'])
 def visits():
     if handle_visits:
         response_data, status_code = handle_visits(normalize_path, increment_visit, get_counts)
-        return jsonify(response_data), status_code
+        return json_response(response_data, status_code)
     
     # Fallback implementation
-    try:
-        if request.method == 'POST':
-            data = request.get_json(silent=True) or {}
-            path = normalize_path(data.get('path') or '/')
+    if request.method == 'POST':
+        data = parse_json_body()
+        if not isinstance(data, dict):
+            data = {}
+        raw_path = data.get('path')
+        path = normalize_path(raw_path if isinstance(raw_path, str) and raw_path else '/')
+        try:
             total, page_total, pages = increment_visit(path)
-            return jsonify({
-                'success': True,
-                'path': path,
-                'total': total,
-                'page_total': page_total,
-                'pages': pages
-            })
-
-        counts = get_counts()
-        return jsonify({
+        except (OSError, ValueError) as e:
+            logger.error(f"[ERROR] /api/visits failed: {e}")
+            return json_response({'error': str(e)}, 500)
+        return json_response({
             'success': True,
-            'total': counts.get('total', 0),
-            'pages': counts.get('pages', {})
+            'path': path,
+            'total': total,
+            'page_total': page_total,
+            'pages': pages
         })
-    except Exception as e:
+
+    try:
+        counts = get_counts()
+    except (OSError, ValueError) as e:
         logger.error(f"[ERROR] /api/visits failed: {e}")
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
+    return json_response({
+        'success': True,
+        'total': counts.get('total', 0),
+        'pages': counts.get('pages', {})
+    })
 
 @app.route('/api/messages', methods=['GET'])
 def get_messages():
@@ -480,7 +1063,7 @@ def clear_messages():
     try:
         from backend.conversation_memory import get_conversation_memory
         
-        data = request.get_json(silent=True) or {}
+        data = parse_json_body() or {}
         user_id = data.get('user_id', 'default')
         
         memory = get_conversation_memory()
@@ -514,6 +1097,12 @@ def get_memory_stats():
 # ============================================
 # OpenAI Text-to-Speech API Endpoint
 # ============================================
+# Everything Edge TTS can't speak: keep Thai, English, digits, whitespace and
+# basic punctuation (.,!?%). Markdown asterisks fall outside the class too.
+_RE_EDGE_TTS_UNSPEAKABLE = re.compile(r'[^\u0E00-\u0E7F a-zA-Z0-9\s.,!?%]+')
+_RE_EDGE_TTS_SPACES = re.compile(r'\s+')
+
+
 @app.route('/api/tts', methods=['POST'])
 def tts_endpoint():
     """
@@ -521,30 +1110,26 @@ def tts_endpoint():
     Returns audio as base64-encoded MP3.
     """
     import asyncio
-    import base64
     import tempfile
     import edge_tts
     import nest_asyncio
-    import re
     
     # Apply nest_asyncio to allow nested event loops 
     # (crucial for Flask/Gunicorn environments)
     nest_asyncio.apply()
 
     try:
-        data = request.get_json(silent=True) or {}
+        data = parse_json_body() or {}
         text = data.get('text', '').strip()
         
         # [CLEANUP] Remove emojis and special characters for TTS
         # Keep: Thai chars (\u0E00-\u0E7F), English (a-zA-Z), Numbers (0-9), 
         # Spaces (\s), and basic punctuation (.,!?%)
         if text:
-            # First, remove markdown bold/italic asterisks
-            text = text.replace('*', '')
-            # Regex to keep only speakable characters
-            text = re.sub(r'[^\u0E00-\u0E7F a-zA-Z0-9\s.,!?%]', '', text)
+            # Keep only speakable characters (this also drops markdown asterisks)
+            text = _RE_EDGE_TTS_UNSPEAKABLE.sub('', text)
             # Collapse multiple spaces
-            text = re.sub(r'\s+', ' ', text).strip()
+            text = _RE_EDGE_TTS_SPACES.sub(' ', text).strip()
             
         # Switch to Achara (Younger, brighter Thai female voice)
         voice = "th-TH-AcharaNeural" 
@@ -603,7 +1188,7 @@ def tts_endpoint():
         # Read the file and convert to base64
         with open(temp_filename, "rb") as f:
             audio_content = f.read()
-            audio_base64 = base64.b64encode(audio_content).decode('utf-8')
+            audio_base64 = b64encode_text(audio_content)
             
         # Clean up
         try:
@@ -650,9 +1235,7 @@ def post_message_stream():
     """Streaming endpoint for chat responses using Server-Sent Events."""
     try:
         # ===== iOS FIX: Add request deduplication =====
-        cleanup_caches()  # Cleanup old cache entries
-        
-        data = request.get_json(silent=True) or {}
+        data = parse_json_body() or {}
         user_message = data.get('text') or data.get('message') or ''
         user_id = data.get('user_id', 'default')
         request_id = data.get('request_id') or str(uuid.uuid4())
@@ -680,17 +1263,15 @@ def post_message_stream():
             pass  # Not authenticated, use default
         
         # Check for duplicate/retry requests (same request_id within 5 seconds)
-        if request_id in _ACTIVE_REQUESTS:
-            elapsed = time.time() - _ACTIVE_REQUESTS[request_id]
-            if elapsed < 5:
-                logger.warning(f"[iOS] Duplicate request detected: {request_id} (elapsed: {elapsed}s)")
-                return jsonify({
-                    'success': False,
-                    'error': True,
-                    'message': 'Duplicate request - already processing'
-                }), 409
+        elapsed = _claim_request(request_id)
+        if elapsed is not None:
+            logger.warning(f"[iOS] Duplicate request detected: {request_id} (elapsed: {elapsed}s)")
+            return jsonify({
+                'success': False,
+                'error': True,
+                'message': 'Duplicate request - already processing'
+            }), 409
         
-        _ACTIVE_REQUESTS[request_id] = time.time()
         logger.info(f"[iOS] Stream request started: {request_id} (user: {user_id})")
         
         def generate():
@@ -700,7 +1281,7 @@ def post_message_stream():
                 # Use singleton chatbot instead of creating new instance
                 chatbot = get_chatbot()
                 if not chatbot:
-                    yield "data: " + json.dumps({'type': 'error', 'message': 'Chatbot initialization failed'}, ensure_ascii=False) + "\n\n"
+                    yield _sse({'type': 'error', 'message': 'Chatbot initialization failed'})
                     return
                 
                 from backend.conversation_memory import get_conversation_memory
@@ -714,49 +1295,27 @@ def post_message_stream():
                 conversation_history = memory.get_history(user_id)
                 
                 # ===== iOS FIX: Cache intent classification =====
-                query_hash = hashlib.md5(user_message.encode()).hexdigest()
-                cache_key = f"{user_id}:{query_hash}"
+                # Tuples hash from their elements' hashes (an int hashes to
+                # itself), so no key string is formatted or SipHashed per lookup
+                cache_key = (user_id, text_digest(user_message))
                 
-                if cache_key in _INTENT_CACHE:
-                    elapsed = time.time() - _INTENT_CACHE[cache_key]['timestamp']
-                    if elapsed < _CACHE_TTL:
-                        intent_classification = _INTENT_CACHE[cache_key]['data']
-                        logger.debug(f"[iOS] Intent classification cache HIT for {request_id}")
-                    else:
-                        del _INTENT_CACHE[cache_key]
-                        intent_classification = chatbot._classify_intent(user_message)
-                        _INTENT_CACHE[cache_key] = {
-                            'data': intent_classification,
-                            'timestamp': time.time()
-                        }
+                cached_intent = _cache_get(_INTENT_CACHE, cache_key)
+                if cached_intent is not None:
+                    intent_classification = cached_intent['data']
+                    logger.debug(f"[iOS] Intent classification cache HIT for {request_id}")
                 else:
                     intent_classification = chatbot._classify_intent(user_message)
-                    _INTENT_CACHE[cache_key] = {
-                        'data': intent_classification,
-                        'timestamp': time.time()
-                    }
+                    _cache_set(_INTENT_CACHE, cache_key, data=intent_classification)
                 
                 # Send intent classification first
-                yield "data: " + json.dumps({'type': 'intent', 'intent_type': intent_classification['intent_type'], 'keywords': intent_classification['keywords'][:3]}, ensure_ascii=False) + "\n\n"
+                yield _sse({'type': 'intent', 'intent_type': intent_classification['intent_type'], 'keywords': intent_classification['keywords'][:3]})
                 
                 # ===== iOS FIX: Cache matched data =====
-                if cache_key in _MATCH_CACHE:
-                    elapsed = time.time() - _MATCH_CACHE[cache_key]['timestamp']
-                    if elapsed < _CACHE_TTL:
-                        matched_data = _MATCH_CACHE[cache_key]['data']
-                        query_type = _MATCH_CACHE[cache_key].get('query_type', intent_classification['intent_type'])
-                        logger.debug(f"[iOS] Match data cache HIT for {request_id}")
-                    else:
-                        del _MATCH_CACHE[cache_key]
-                        matched_data, query_type = chatbot._match_travel_data(
-                            user_message,
-                            keywords=intent_classification.get('keywords'),
-                        )
-                        _MATCH_CACHE[cache_key] = {
-                            'data': matched_data,
-                            'query_type': query_type,
-                            'timestamp': time.time()
-                        }
+                cached_match = _cache_get(_MATCH_CACHE, cache_key)
+                if cached_match is not None:
+                    matched_data = cached_match['data']
+                    query_type = cached_match.get('query_type', intent_classification['intent_type'])
+                    logger.debug(f"[iOS] Match data cache HIT for {request_id}")
                 else:
                     # ============ LOCATION-AWARE SEARCH (NEW) ============
                     # Extract location reference and try proximity search first
@@ -794,23 +1353,16 @@ def post_message_stream():
                             keywords=intent_classification.get('keywords'),
                         )
                     
-                    _MATCH_CACHE[cache_key] = {
-                        'data': matched_data,
-                        'query_type': query_type,
-                        'timestamp': time.time()
-                    }
+                    _cache_set(_MATCH_CACHE, cache_key, data=matched_data, query_type=query_type)
                 
                 # Send structured data
                 logger.info(f"[Stream] matched_data count: {len(matched_data) if matched_data else 0}")
                 if matched_data:
-                    yield "data: " + json.dumps({'type': 'structured_data', 'data': matched_data[:6]}, ensure_ascii=False) + "\n\n"
+                    yield _sse({'type': 'structured_data', 'data': matched_data[:6]})
                 
                 # Store full assistant response
                 assistant_response = ""
                 
-                # ===== iOS FIX: Add heartbeat to keep connection alive =====
-                last_heartbeat = time.time()
-                
                 # Stream GPT response
                 if chatbot.gpt_service:
                     analysis_context = None
@@ -819,11 +1371,12 @@ def post_message_stream():
                             intent_classification['clean_question'],
                             chatbot._detect_language(intent_classification['clean_question'])
                         )
-                        analysis_context = json.dumps(analysis_payload, ensure_ascii=False)
+                        analysis_context = json_dumps(analysis_payload).decode('utf-8')
                     except Exception as exc:
                         logger.warning(f"[GPT] Intent analysis skipped: {exc}")
 
-                    for chunk in chatbot.gpt_service.generate_response_stream(
+                    # Heartbeats keep iOS connections alive while waiting on GPT
+                    for chunk in _iter_in_pool(lambda: chatbot.gpt_service.generate_response_stream(
                         user_query=intent_classification['clean_question'],
                         context_data=matched_data,
                         data_type='travel',
@@ -837,16 +1390,12 @@ def post_message_stream():
                         },
                         analysis_context=analysis_context,
                         conversation_history=conversation_history
-                    ):
-                        # Send heartbeat every 5 seconds to keep iOS connection alive
-                        current_time = time.time()
-                        if current_time - last_heartbeat > 5:
-                            yield "data: " + json.dumps({'type': 'heartbeat'}, ensure_ascii=False) + "\n\n"
-                            last_heartbeat = current_time
-                        
-                        if 'chunk' in chunk:
+                    ), coalesce='chunk'):
+                        if chunk is None:
+                            yield _SSE_HEARTBEAT
+                        elif 'chunk' in chunk:
                             assistant_response += chunk['chunk']
-                            yield "data: " + json.dumps({'type': 'text', 'text': chunk['chunk']}, ensure_ascii=False) + "\n\n"
+                            yield _sse({'type': 'text', 'text': chunk['chunk']})
                         elif 'done' in chunk:
                             # Save conversation to memory
                             memory.add_message(user_id, "user", user_message)
@@ -887,13 +1436,13 @@ def post_message_stream():
                             except Exception as log_err:
                                 logger.warning(f"[ChatLog] Failed to save: {log_err}")
                             
-                            yield "data: " + json.dumps({
+                            yield _sse({
                                 'type': 'done',
                                 'language': language,
                                 'chat_log_id': chat_log_id
-                            }, ensure_ascii=False) + "\n\n"
+                            })
                         elif 'error' in chunk:
-                            yield "data: " + json.dumps({'type': 'error', 'message': chunk['error']}, ensure_ascii=False) + "\n\n"
+                            yield _sse({'type': 'error', 'message': chunk['error']})
                 else:
                     # Fallback to simple response
                     simple_response = chatbot._create_simple_response(
@@ -906,24 +1455,22 @@ def post_message_stream():
                     memory.add_message(user_id, "user", user_message)
                     memory.add_message(user_id, "assistant", simple_response)
                     
-                    yield "data: " + json.dumps({'type': 'text', 'text': simple_response}, ensure_ascii=False) + "\n\n"
-                    yield "data: " + json.dumps({'type': 'done', 'language': language}, ensure_ascii=False) + "\n\n"
+                    yield _sse({'type': 'text', 'text': simple_response})
+                    yield _sse({'type': 'done', 'language': language})
                     
             except Exception as e:
                 logger.exception("Error in streaming generation")
-                yield "data: " + json.dumps({'type': 'error', 'message': str(e)}, ensure_ascii=False) + "\n\n"
+                yield _sse({'type': 'error', 'message': str(e)})
             finally:
                 # Remove from active requests when done
-                if request_id in _ACTIVE_REQUESTS:
-                    del _ACTIVE_REQUESTS[request_id]
+                if _release_request(request_id):
                     logger.info(f"[iOS] Stream request completed: {request_id}")
         
         return Response(generate(), mimetype='text/event-stream')
 
     except Exception as e:
         app.logger.exception("Error in /api/messages/stream")
-        if request_id in _ACTIVE_REQUESTS:
-            del _ACTIVE_REQUESTS[request_id]
+        _release_request(request_id)
         return jsonify({
             'success': False,
             'error': True,
@@ -931,10 +1478,78 @@ def post_message_stream():
         }), 500
 
 
+# ===== Shared OpenAI client =====
+# One client per process so Whisper/TTS calls reuse the httpx connection pool
+# (and its TLS sessions) instead of building a new one per request.
+_OPENAI_CLIENT = None
+_OPENAI_CLIENT_LOCK = threading.Lock()
+
+
+def get_openai_client():
+    """Return the process-wide OpenAI client, or None if OPENAI_API_KEY is unset."""
+    global _OPENAI_CLIENT
+    if _OPENAI_CLIENT is None:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            return None
+        with _OPENAI_CLIENT_LOCK:
+            if _OPENAI_CLIENT is None:
+                from openai import OpenAI
+                _OPENAI_CLIENT = OpenAI(api_key=api_key, timeout=CHAT_TIMEOUT_SECONDS)
+    return _OPENAI_CLIENT
+
+# ===== End shared OpenAI client =====
+
+# ===== TTS providers =====
+try:
+    from gtts import gTTS
+except ImportError:  # pragma: no cover - optional dependency during runtime
+    gTTS = None  # type: ignore
+# Probed once here so text_to_speech branches on a bool per request
+GTTS_AVAILABLE = gTTS is not None
+if not GTTS_AVAILABLE:
+    logger.info("gTTS not installed; text-to-speech will use Google Cloud / OpenAI")
+
+# google.cloud.texttospeech pulls in grpc/protobuf, so it is imported on first
+# use; the client (and its gRPC channel) is then kept for the process. A failure
+# (missing package or credentials) is remembered too, so later requests go
+# straight to the next provider instead of repeating the credential lookup.
+_GOOGLE_TTS = None
+_GOOGLE_TTS_ERROR: str | None = None
+_GOOGLE_TTS_LOCK = threading.Lock()
+
+
+def get_google_tts_client():
+    """Return (texttospeech module, TextToSpeechClient); raise RuntimeError if unavailable."""
+    global _GOOGLE_TTS, _GOOGLE_TTS_ERROR
+    if _GOOGLE_TTS is None and _GOOGLE_TTS_ERROR is None:
+        with _GOOGLE_TTS_LOCK:
+            if _GOOGLE_TTS is None and _GOOGLE_TTS_ERROR is None:
+                try:
+                    from google.cloud import texttospeech
+                    _GOOGLE_TTS = (texttospeech, texttospeech.TextToSpeechClient())
+                except Exception as e:
+                    _GOOGLE_TTS_ERROR = str(e)
+    if _GOOGLE_TTS is None:
+        raise RuntimeError(f"Google Cloud TTS unavailable: {_GOOGLE_TTS_ERROR}")
+    return _GOOGLE_TTS
+
+# ===== End TTS providers =====
+
+
 @app.route('/api/speech-to-text', methods=['POST'])
 def speech_to_text():
     """Convert speech audio to text using OpenAI Whisper API."""
     try:
+        # Check size (25MB Whisper limit) from the header, before the multipart
+        # body is parsed or spooled; the multipart envelope adds only a few
+        # hundred bytes, and MAX_CONTENT_LENGTH catches lying clients.
+        if (request.content_length or 0) > WHISPER_MAX_UPLOAD_BYTES:
+            return jsonify({
+                'success': False,
+                'error': 'Audio file too large (max 25MB)'
+            }), 400
+
         # Check if audio file is in request
         if 'audio' not in request.files:
             return jsonify({
@@ -944,33 +1559,21 @@ def speech_to_text():
         
         audio_file = request.files['audio']
         
-        # Check file size (limit to 25MB for Whisper API)
-        audio_file.seek(0, 2)  # Seek to end
-        file_size = audio_file.tell()
-        audio_file.seek(0)  # Reset to beginning
-        
-        if file_size > 25 * 1024 * 1024:
-            return jsonify({
-                'success': False,
-                'error': 'Audio file too large (max 25MB)'
-            }), 400
-        
         # Use OpenAI Whisper API
-        from openai import OpenAI
-        api_key = os.getenv("OPENAI_API_KEY")
+        client = get_openai_client()
         
-        if not api_key:
+        if client is None:
             return jsonify({
                 'success': False,
                 'error': 'OpenAI API key not configured'
             }), 500
         
-        client = OpenAI(api_key=api_key)
-        
-        # Transcribe audio - convert FileStorage to file-like object
+        # Hand Whisper werkzeug's own upload stream (in memory when small,
+        # spooled to a temp file when large); the SDK passes file objects
+        # through to httpx, which reads them in chunks rather than all at once
         transcript = client.audio.transcriptions.create(
             model="whisper-1",
-            file=(audio_file.filename, audio_file.stream, audio_file.content_type),
+            file=(audio_file.filename or 'audio.webm', audio_file.stream, audio_file.content_type or 'audio/webm'),
             language="th"  # Default to Thai, can be auto-detected
         )
         
@@ -1073,48 +1676,84 @@ def vad_status():
         }), 500
 
 
-def clean_text_for_speech(text: str) -> str:
-    """Clean text by removing markdown and special formatting while preserving natural speech flow."""
-    import re
-    
+# Patterns for clean_text_for_speech, compiled once at import
+_RE_MD_BOLD_STARS = re.compile(r'\*\*(.+?)\*\*')            # **bold**
+_RE_MD_ITALIC_STAR = re.compile(r'\*(.+?)\*')                 # *italic*
+_RE_MD_BOLD_UNDERSCORES = re.compile(r'__(.+?)__')          # __bold__
+_RE_MD_ITALIC_UNDERSCORE = re.compile(r'_(.+?)_')           # _italic_
+_RE_MD_HEADER = re.compile(r'^#+\s+(.+)$', re.MULTILINE)
+_RE_MD_BULLET = re.compile(r'^\s*[-*+]\s+(.+)$', re.MULTILINE)
+_RE_MD_NUMBERED = re.compile(r'^\s*\d+\.\s+(.+)$', re.MULTILINE)
+# Emojis -> space via str.translate (plus the U+FE0F variation selector that
+# follows some of them); the whitespace collapse below merges the spaces
+_SPEECH_EMOJI_TABLE = str.maketrans(dict.fromkeys('🏛🛶🌲🚣🏖🏔🌆📍✨🎉🔥⭐✅❌⚠💎🔑🌐🎯🚀📊🎨🎤🔊\ufe0f', ' '))
+_RE_URL = re.compile(r'https?://\S+')
+_RE_PARENS = re.compile(r'\(([^)]+)\)')
+# Paragraph break -> sentence break, single newline -> space, in one scan
+_RE_NEWLINES = re.compile(r'\n(\n+)?')
+_RE_REPEATED_PUNCT = re.compile(r'([.!?])\1+')
+_RE_PUNCT_SPACING = re.compile(r'\s*([.!?,])\s*')
+_RE_COMMA_BEFORE_END = re.compile(r',\s*([.!?])')
+# A whitespace run, optionally followed by punctuation: collapses runs to one
+# space and drops the space before punctuation in the same pass
+_RE_WHITESPACE_RUN = re.compile(r'\s+([.!?,])?')
+
+
+def _collapse_whitespace(match: re.Match) -> str:
+    return match.group(1) or ' '
+
+
+def _newline_to_pause(match: re.Match) -> str:
+    return '. ' if match.group(1) else ' '
+
+
+def clean_text_for_speech(text: str) -> str:
+    """Clean text by removing markdown and special formatting while preserving natural speech flow."""
+    # Each markdown pass below only runs if its trigger character is present;
+    # the substring test is a C-level scan, far cheaper than a regex pass.
+    # Plain GPT sentences usually skip most of them.
+
     # Remove markdown bold/italic markers while preserving the text
-    text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)  # **bold**
-    text = re.sub(r'\*(.+?)\*', r'\1', text)      # *italic*
-    text = re.sub(r'__(.+?)__', r'\1', text)      # __bold__
-    text = re.sub(r'_(.+?)_', r'\1', text)        # _italic_
+    if '*' in text:
+        text = _RE_MD_BOLD_STARS.sub(r'\1', text)
+        text = _RE_MD_ITALIC_STAR.sub(r'\1', text)
+    if '_' in text:
+        text = _RE_MD_BOLD_UNDERSCORES.sub(r'\1', text)
+        text = _RE_MD_ITALIC_UNDERSCORE.sub(r'\1', text)
     
     # Remove markdown headers but keep the text with proper spacing
-    text = re.sub(r'^#+\s+(.+)$', r'\1. ', text, flags=re.MULTILINE)  # # Header -> Header.
+    if '#' in text:
+        text = _RE_MD_HEADER.sub(r'\1. ', text)  # # Header -> Header.
     
     # Convert list markers to natural pauses
-    text = re.sub(r'^\s*[-*+]\s+(.+)$', r'\1, ', text, flags=re.MULTILINE)  # - item -> item,
-    text = re.sub(r'^\s*\d+\.\s+(.+)$', r'\1, ', text, flags=re.MULTILINE)  # 1. item -> item,
+    text = _RE_MD_BULLET.sub(r'\1, ', text)    # - item -> item,
+    if '.' in text:
+        text = _RE_MD_NUMBERED.sub(r'\1, ', text)  # 1. item -> item,
     
     # Remove emojis but add slight pause where they were
-    text = re.sub(r'[🏛️🛶🌲🚣🏖️🏔️🌆📍✨🎉🔥⭐✅❌⚠️💎🔑🌐🎯🚀📊🎨🎤🔊]+', ' ', text)
+    text = text.translate(_SPEECH_EMOJI_TABLE)
     
     # Remove URLs
-    text = re.sub(r'https?://\S+', '', text)
+    if '://' in text:
+        text = _RE_URL.sub('', text)
     
     # Remove parentheses but keep the content with commas for natural pauses
-    text = re.sub(r'\(([^)]+)\)', r', \1, ', text)
+    if '(' in text:
+        text = _RE_PARENS.sub(r', \1, ', text)
     
     # Convert newlines to natural sentence breaks
-    text = re.sub(r'\n\n+', '. ', text)  # Double newlines -> period + space
-    text = re.sub(r'\n', ' ', text)      # Single newlines -> space
+    if '\n' in text:
+        text = _RE_NEWLINES.sub(_newline_to_pause, text)
     
     # Clean up multiple punctuation
-    text = re.sub(r'([.!?])\1+', r'\1', text)  # Remove duplicate punctuation
-    text = re.sub(r'\s*([.!?,])\s*', r'\1 ', text)  # Normalize spacing around punctuation
+    text = _RE_REPEATED_PUNCT.sub(r'\1', text)     # Remove duplicate punctuation
+    text = _RE_PUNCT_SPACING.sub(r'\1 ', text)     # Normalize spacing around punctuation
     
     # Remove extra commas at end of sentences
-    text = re.sub(r',\s*([.!?])', r'\1', text)
+    text = _RE_COMMA_BEFORE_END.sub(r'\1', text)
     
-    # Normalize spaces - ensure single space between words
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Clean up spaces before punctuation
-    text = re.sub(r'\s+([.!?,])', r'\1', text)
+    # Single spaces between words, none before punctuation
+    text = _RE_WHITESPACE_RUN.sub(_collapse_whitespace, text)
     
     # Ensure sentences end properly for natural pauses
     if text and not text[-1] in '.!?':
@@ -1125,13 +1764,291 @@ def clean_text_for_speech(text: str) -> str:
     return text
 
 
+TTS_STREAM_CHUNK_BYTES = 16 * 1024
+
+
+def _wants_audio_stream(data: dict) -> bool:
+    """True if the client asked for raw audio/mpeg rather than base64 JSON.
+
+    ``?format=json`` (or ``"return_base64": true``) and ``?format=mp3`` /
+    ``?format=binary`` override the Accept header, for clients that cannot set it.
+    """
+    fmt = request.args.get('format')
+    if fmt == 'json' or data.get('return_base64'):
+        return False
+    if fmt in ('mp3', 'binary') or data.get('stream'):
+        return True
+    return request.accept_mimetypes.best_match(['application/json', 'audio/mpeg']) == 'audio/mpeg'
+
+
+def _audio_response(body, provider: str) -> Response:
+    """Send raw MP3 to the client.
+
+    ``body`` is either an iterator of chunks, streamed as the TTS backend
+    produces them, or a finished clip as bytes, which goes out in one body with
+    a Content-Length so the browser's <audio> element knows its size up front.
+    """
+    response = Response(body, mimetype='audio/mpeg')
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['X-TTS-Provider'] = provider
+    return response
+
+
+# Synthesized MP3s keyed on (requested language, digest of cleaned text).
+# Greetings, error messages and popular answers repeat a lot, and a hit skips
+# the provider round trip entirely. Bounded by total audio bytes, LRU order.
+TTS_CACHE_MAX_BYTES = int(os.getenv('TTS_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+_TTS_CACHE: OrderedDict = OrderedDict()  # key -> (provider, mp3 bytes)
+_TTS_CACHE_SIZE = 0
+_TTS_CACHE_LOCK = threading.Lock()
+
+
+# Optional second tier on disk (off unless TTS_DISK_CACHE_DIR is set): shared
+# by every gunicorn worker and kept across restarts. Clips found there are
+# reported with provider 'cache'. Nothing prunes it; point it at a volume.
+TTS_DISK_CACHE_DIR = os.getenv('TTS_DISK_CACHE_DIR', '')
+if TTS_DISK_CACHE_DIR:
+    os.makedirs(TTS_DISK_CACHE_DIR, exist_ok=True)
+
+
+def _tts_disk_path(key: tuple[str, int]) -> str:
+    # Hashed so a client-supplied language can never shape the path
+    name = hashlib.blake2b(repr(key).encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(TTS_DISK_CACHE_DIR, f"{name}.mp3")
+
+
+def _tts_cache_get(key: tuple[str, int]) -> tuple[str, bytes] | None:
+    with _TTS_CACHE_LOCK:
+        entry = _TTS_CACHE.get(key)
+        if entry is not None:
+            _TTS_CACHE.move_to_end(key)
+            return entry
+    if not TTS_DISK_CACHE_DIR:
+        return None
+    try:
+        with open(_tts_disk_path(key), 'rb') as f:
+            audio = f.read()
+    except OSError:
+        return None
+    _tts_cache_put(key, 'cache', audio, persist=False)
+    return 'cache', audio
+
+
+def _tts_cache_put(key: tuple[str, int], provider: str, audio: bytes, persist: bool = True) -> None:
+    global _TTS_CACHE_SIZE
+    if not audio or len(audio) > TTS_CACHE_MAX_BYTES // 4:
+        return  # Don't let one long reading evict everything else
+    if persist and TTS_DISK_CACHE_DIR:
+        path = _tts_disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(audio)
+            os.replace(tmp_path, path)  # Readers never see a partial clip
+        except OSError as e:
+            logger.warning(f"TTS disk cache write failed: {e}")
+    with _TTS_CACHE_LOCK:
+        previous = _TTS_CACHE.pop(key, None)
+        if previous is not None:
+            _TTS_CACHE_SIZE -= len(previous[1])
+        _TTS_CACHE[key] = (provider, audio)
+        _TTS_CACHE_SIZE += len(audio)
+        while _TTS_CACHE_SIZE > TTS_CACHE_MAX_BYTES:
+            _, (_, evicted) = _TTS_CACHE.popitem(last=False)
+            _TTS_CACHE_SIZE -= len(evicted)
+
+
+def _cache_tts_stream(chunks, key: tuple[str, int], provider: str):
+    """Pass audio chunks through, caching the whole clip once the stream completes."""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    _tts_cache_put(key, provider, b''.join(parts))
+
+
+# Identical TTS requests that arrive while the first is still synthesizing wait
+# for it and are answered from the cache, instead of each paying the provider
+# round trip. Maps cache key -> Event set once the leader's response is sent.
+TTS_INFLIGHT_WAIT_SECONDS = float(os.getenv('TTS_INFLIGHT_WAIT_SECONDS', '15'))
+_TTS_INFLIGHT: dict = {}
+
+
+def _tts_claim(key: tuple[str, int]) -> threading.Event | None:
+    """Register this request as the one synthesizing ``key``.
+
+    Returns None if it is now the leader, or the leader's Event to wait on.
+    """
+    with _TTS_CACHE_LOCK:
+        pending = _TTS_INFLIGHT.get(key)
+        if pending is None:
+            _TTS_INFLIGHT[key] = threading.Event()
+        return pending
+
+
+def _tts_release(key: tuple[str, int]) -> None:
+    with _TTS_CACHE_LOCK:
+        done = _TTS_INFLIGHT.pop(key, None)
+    if done is not None:
+        done.set()
+
+
+def _tts_json_response(audio, provider: str) -> Response:
+    return jsonify({
+        'success': True,
+        'audio': b64encode_text(audio),
+        'format': 'mp3',
+        'provider': provider
+    })
+
+
+_NO_TTS_PROVIDER_ERROR = 'No TTS service available. Please install gTTS: pip install gTTS'
+
+
+def _gtts_clip(text: str, speak_thai: bool) -> bytes:
+    """Synthesize with gTTS (free, no API key, good Thai)."""
+    tts = gTTS(text=text, lang='th' if speak_thai else 'en', slow=False)
+    audio_io = io.BytesIO()
+    tts.write_to_fp(audio_io)
+    # getvalue() hands over BytesIO's own buffer (no seek/read copy)
+    return audio_io.getvalue()
+
+
+def _google_tts_clip(text: str, speak_thai: bool) -> bytes:
+    """Synthesize with Google Cloud TTS (best quality, requires credentials)."""
+    texttospeech, client = get_google_tts_client()
+    
+    # Configure voice - use Thai female voice for natural pronunciation
+    if speak_thai:
+        voice = texttospeech.VoiceSelectionParams(
+            language_code="th-TH",
+            name="th-TH-Standard-A",  # Female voice
+            ssml_gender=texttospeech.SsmlVoiceGender.FEMALE
+        )
+    else:
+        voice = texttospeech.VoiceSelectionParams(
+            language_code="en-US",
+            name="en-US-Neural2-F",
+            ssml_gender=texttospeech.SsmlVoiceGender.FEMALE
+        )
+    
+    # Configure audio output
+    audio_config = texttospeech.AudioConfig(
+        audio_encoding=texttospeech.AudioEncoding.MP3,
+        speaking_rate=1.5,  # Faster speech - average human speed
+        pitch=0.0
+    )
+    
+    response = client.synthesize_speech(
+        input=texttospeech.SynthesisInput(text=text),
+        voice=voice,
+        audio_config=audio_config
+    )
+    return response.audio_content
+
+
+def _synthesize_tts_clip(text: str, speak_thai: bool, cache_key: tuple[str, int]) -> tuple[str, bytes]:
+    """Return (provider, mp3) from the first TTS provider that works, and cache it.
+
+    Tries gTTS, then Google Cloud TTS, then OpenAI; raises RuntimeError if
+    none is available.
+    """
+    if GTTS_AVAILABLE:
+        try:
+            provider, audio = 'gtts-free', _gtts_clip(text, speak_thai)
+        except Exception as gtts_error:
+            logger.warning(f"gTTS failed: {gtts_error}, trying Google Cloud TTS")
+        else:
+            _tts_cache_put(cache_key, provider, audio)
+            return provider, audio
+    
+    try:
+        provider, audio = 'google-cloud-tts', _google_tts_clip(text, speak_thai)
+    except Exception as google_error:
+        logger.warning(f"Google Cloud TTS failed: {google_error}, falling back to OpenAI")
+        client = get_openai_client()
+        if client is None:
+            raise RuntimeError(_NO_TTS_PROVIDER_ERROR)
+        response = client.audio.speech.create(
+            model="tts-1",
+            voice="nova",
+            input=text,
+            speed=1.4  # Faster speech - average human speed
+        )
+        provider, audio = 'openai-tts', response.content
+    _tts_cache_put(cache_key, provider, audio)
+    return provider, audio
+
+
+# Deferred TTS jobs (POST with "async": true). Synthesis runs on its own pool
+# and the finished clip lands in the TTS cache as well, so a job whose Future
+# has been evicted from here can still be answered by simply re-posting.
+TTS_JOB_TTL_SECONDS = 300
+TTS_JOB_WAIT_SECONDS = 30
+_TTS_JOBS_MAX = 512
+_TTS_POOL = concurrent.futures.ThreadPoolExecutor(
+    max_workers=int(os.getenv('TTS_POOL_SIZE', '8')),
+    thread_name_prefix="tts",
+)
+atexit.register(_TTS_POOL.shutdown, wait=False)
+_TTS_JOBS: OrderedDict = OrderedDict()  # job_id -> (submitted_at, Future)
+_TTS_JOBS_LOCK = threading.Lock()
+
+
+def _submit_tts_job(text: str, speak_thai: bool, cache_key: tuple[str, int]) -> str:
+    job_id = uuid.uuid4().hex
+    future = _TTS_POOL.submit(_synthesize_tts_clip, text, speak_thai, cache_key)
+    now = time.time()
+    with _TTS_JOBS_LOCK:
+        # Oldest first, so expired or surplus jobs are always at the front
+        while _TTS_JOBS and (
+            len(_TTS_JOBS) >= _TTS_JOBS_MAX
+            or now - next(iter(_TTS_JOBS.values()))[0] > TTS_JOB_TTL_SECONDS
+        ):
+            _TTS_JOBS.popitem(last=False)
+        _TTS_JOBS[job_id] = (now, future)
+    return job_id
+
+
+@app.route('/api/text-to-speech/<job_id>', methods=['GET'])
+def text_to_speech_job(job_id: str):
+    """Collect the clip for a job started by POST /api/text-to-speech with "async": true.
+
+    Waits up to TTS_JOB_WAIT_SECONDS, then answers 202 so the client can poll
+    again. Format negotiation matches the POST endpoint.
+    """
+    with _TTS_JOBS_LOCK:
+        job = _TTS_JOBS.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown or expired TTS job'}), 404
+    try:
+        provider, audio = job[1].result(timeout=TTS_JOB_WAIT_SECONDS)
+    except TimeoutError:
+        return jsonify({'success': True, 'status': 'pending', 'job_id': job_id}), 202
+    except Exception as e:
+        logger.warning(f"TTS job {job_id} failed: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    if _wants_audio_stream({}):
+        return _audio_response(audio, provider)
+    return _tts_json_response(audio, provider)
+
+
 @app.route('/api/text-to-speech', methods=['POST'])
 def text_to_speech():
-    """Convert text to speech audio using gTTS (free) or Google Cloud TTS for natural Thai voice."""
+    """Convert text to speech audio using gTTS (free) or Google Cloud TTS for natural Thai voice.
+
+    Responds with base64 MP3 in JSON by default. Clients sending
+    ``Accept: audio/mpeg`` (or ``"stream": true`` / ``?format=mp3``) get raw
+    MP3 instead, streamed as it is synthesized where the provider allows,
+    without the base64 inflation. ``?format=json`` forces the JSON shape.
+    With ``"async": true`` a cache miss answers 202 with a ``job_id`` right
+    away; see text_to_speech_job.
+    """
     try:
-        data = request.get_json(silent=True) or {}
+        data = parse_json_body() or {}
         text = data.get('text', '')
         language = data.get('language', 'th')  # Default to Thai
+        stream_audio = _wants_audio_stream(data)
         
         if not text:
             return jsonify({
@@ -1148,120 +2065,82 @@ def text_to_speech():
                 'error': 'No speakable text after cleaning'
             }), 400
         
-        import base64
+        # Voice language, decided once for every provider below. An explicit
+        # language wins; only scan the text when the caller asked for 'auto'.
+        if language in (None, '', 'auto'):
+            speak_thai = is_thai_text(cleaned_text)
+        else:
+            speak_thai = language == 'th'
+        
+        cache_key = (language, text_digest(cleaned_text))
+        cached = _tts_cache_get(cache_key)
+        if cached is None and data.get('async'):
+            # Hand back a job id now; the client collects the clip from
+            # GET /api/text-to-speech/<job_id> once it needs it
+            return json_response({'success': True, 'job_id': _submit_tts_job(cleaned_text, speak_thai, cache_key)}, 202)
+        if cached is None:
+            pending = _tts_claim(cache_key)
+            if pending is None:
+                # Leader: release waiters once the body (and with it the cache
+                # entry, for streams) is complete, whatever the outcome
+                @after_this_request
+                def _release_tts_claim(response):
+                    response.call_on_close(functools.partial(_tts_release, cache_key))
+                    return response
+            else:
+                pending.wait(TTS_INFLIGHT_WAIT_SECONDS)
+                # Still a miss if the leader failed, timed out or the clip was
+                # too long to cache; then synthesize it ourselves below
+                cached = _tts_cache_get(cache_key)
+        if cached is not None:
+            provider, audio = cached
+            if stream_audio:
+                return _audio_response(audio, provider)
+            return _tts_json_response(audio, provider)
+        
+        if not stream_audio:
+            provider, audio = _synthesize_tts_clip(cleaned_text, speak_thai, cache_key)
+            return _tts_json_response(audio, provider)
         
         # Option 1: Try gTTS first (FREE, no API key needed, great for Thai)
-        try:
-            from gtts import gTTS
-            import io
-            
-            # Auto-detect language if not specified
-            if language == 'th' or any('\u0e00' <= c <= '\u0e7f' for c in cleaned_text):
-                tts_lang = 'th'
-            else:
-                tts_lang = 'en'
-            
-            # Generate speech with gTTS using cleaned text
-            tts = gTTS(text=cleaned_text, lang=tts_lang, slow=False)
-            
-            # Save to BytesIO
-            audio_io = io.BytesIO()
-            tts.write_to_fp(audio_io)
-            audio_io.seek(0)
-            
-            # Convert to base64
-            audio_base64 = base64.b64encode(audio_io.read()).decode('utf-8')
-            
-            return jsonify({
-                'success': True,
-                'audio': audio_base64,
-                'format': 'mp3',
-                'provider': 'gtts-free'
-            })
-            
-        except ImportError:
-            logger.info("gTTS not available, trying Google Cloud TTS")
-        except Exception as gtts_error:
-            logger.warning(f"gTTS failed: {gtts_error}, trying Google Cloud TTS")
+        if GTTS_AVAILABLE:
+            try:
+                tts = gTTS(text=cleaned_text, lang='th' if speak_thai else 'en', slow=False)
+                # gTTS fetches one MP3 fragment per text part. Pull the first
+                # one here so a failure still falls through to the next provider.
+                fragments = tts.stream()
+                first = next(fragments, b'')
+                audio_chunks = _cache_tts_stream(itertools.chain((first,), fragments), cache_key, 'gtts-free')
+                return _audio_response(audio_chunks, 'gtts-free')
+            except Exception as gtts_error:
+                logger.warning(f"gTTS failed: {gtts_error}, trying Google Cloud TTS")
         
         # Option 2: Try Google Cloud TTS (best quality, requires API key)
         try:
-            from google.cloud import texttospeech
-            
-            client = texttospeech.TextToSpeechClient()
-            
-            synthesis_input = texttospeech.SynthesisInput(text=cleaned_text)
-            
-            # Configure voice - use Thai female voice for natural pronunciation
-            if language == 'th' or any(ord(c) >= 0x0e00 and ord(c) <= 0x0e7f for c in cleaned_text):
-                voice = texttospeech.VoiceSelectionParams(
-                    language_code="th-TH",
-                    name="th-TH-Standard-A",  # Female voice
-                    ssml_gender=texttospeech.SsmlVoiceGender.FEMALE
-                )
-            else:
-                voice = texttospeech.VoiceSelectionParams(
-                    language_code="en-US",
-                    name="en-US-Neural2-F",
-                    ssml_gender=texttospeech.SsmlVoiceGender.FEMALE
-                )
-            
-            # Configure audio output
-            audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3,
-                speaking_rate=1.5,  # Faster speech - average human speed
-                pitch=0.0
-            )
-            
-            # Generate speech
-            response = client.synthesize_speech(
-                input=synthesis_input,
-                voice=voice,
-                audio_config=audio_config
-            )
-            
-            # Convert to base64 for JSON response
-            audio_base64 = base64.b64encode(response.audio_content).decode('utf-8')
-            
-            return jsonify({
-                'success': True,
-                'audio': audio_base64,
-                'format': 'mp3',
-                'provider': 'google-cloud-tts'
-            })
-            
+            audio = _google_tts_clip(cleaned_text, speak_thai)
+            _tts_cache_put(cache_key, 'google-cloud-tts', audio)
+            return _audio_response(audio, 'google-cloud-tts')
         except Exception as google_error:
             logger.warning(f"Google Cloud TTS failed: {google_error}, falling back to OpenAI")
-            
-            # Option 3: Fallback to OpenAI TTS
-            from openai import OpenAI
-            
-            api_key = os.getenv("OPENAI_API_KEY")
-            
-            if not api_key:
-                return jsonify({
-                    'success': False,
-                    'error': 'No TTS service available. Please install gTTS: pip install gTTS'
-                }), 500
-            
-            client = OpenAI(api_key=api_key)
-            
-            # Generate speech with OpenAI using cleaned text
-            response = client.audio.speech.create(
+        
+        # Option 3: Fallback to OpenAI TTS
+        client = get_openai_client()
+        if client is None:
+            return jsonify({
+                'success': False,
+                'error': _NO_TTS_PROVIDER_ERROR
+            }), 500
+        
+        def openai_audio():
+            with client.audio.speech.with_streaming_response.create(
                 model="tts-1",
                 voice="nova",
                 input=cleaned_text,
-                speed=1.4  # Faster speech - average human speed
-            )
-            
-            audio_base64 = base64.b64encode(response.content).decode('utf-8')
-            
-            return jsonify({
-                'success': True,
-                'audio': audio_base64,
-                'format': 'mp3',
-                'provider': 'openai-tts'
-            })
+                speed=1.4
+            ) as streamed:
+                yield from streamed.iter_bytes(chunk_size=TTS_STREAM_CHUNK_BYTES)
+        
+        return _audio_response(_cache_tts_stream(openai_audio(), cache_key, 'openai-tts'), 'openai-tts')
         
     except Exception as e:
         logger.exception("Error in text-to-speech")
@@ -1270,163 +2149,229 @@ def text_to_speech():
             'error': str(e)
         }), 500
 
+# Chat result sources that mean the keyword matcher answered instead of GPT
+_FALLBACK_SOURCES = frozenset({'simple_fallback', 'simple'})
+
+
 @app.route('/api/messages', methods=['POST'])
 def post_message():
-    try:
-        data = request.get_json(silent=True) or {}
-        user_message = data.get('text') or data.get('message') or ''
-        user_id = data.get('user_id', 'default')
+    data = parse_json_body()
+    if not isinstance(data, dict):
+        data = {}
+    user_message = data.get('text') or data.get('message') or ''
+    user_id = data.get('user_id', 'default')
+
+    # Validate and sanitize inputs
+    is_valid, error_msg = validate_message_input(user_message)
+    if not is_valid:
+        return json_response({
+            'success': False,
+            'error': True,
+            'message': error_msg
+        }, 400)
 
-        # Validate and sanitize inputs
-        is_valid, error_msg = validate_message_input(user_message)
-        if not is_valid:
-            return jsonify({
-                'success': False,
-                'error': True,
-                'message': error_msg
-            }), 400
-        
-        user_id = sanitize_user_id(user_id)
-        user_message = user_message.strip()
+    user_id = sanitize_user_id(user_id)
+    user_message = user_message.strip()
 
+    try:
         # ----- เรียก get_chat_response แบบมี timeout -----
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(get_chat_response, user_message, user_id)
-            try:
-                result = future.result(timeout=CHAT_TIMEOUT_SECONDS)
-            except TimeoutError:
-                # AI ตอบช้าเกินกำหนด
-                current_time = datetime.datetime.now().isoformat()
-                assistant_payload = {
-                    'role': 'assistant',
-                    'text': 'ขออภัยค่ะ ระบบใช้เวลาประมวลผลนานเกินไป กรุณาลองใหม่อีกครั้งภายหลัง',
-                    'structured_data': [],
-                    'language': 'th',
-                    'intent': None,
-                    'source': 'timeout_fallback',
-                    'createdAt': current_time,
-                    'fallback': True,
-                    'duplicate': False,
-                }
-                response_payload = {
-                    'success': False,
-                    'error': True,
-                    'message': 'AI timeout',
-                    'assistant': assistant_payload,
-                    'data_status': None,
-                    'duplicate': False,
-                }
-                return jsonify(response_payload), 504
+        # Shared pool: a per-request executor's `with` block would wait for the
+        # task on exit, so the timeout below could never actually return early
+        future = _GPT_POOL.submit(get_chat_response, user_message, user_id)
+        try:
+            result = future.result(timeout=CHAT_TIMEOUT_SECONDS)
+        except TimeoutError:
+            # AI ตอบช้าเกินกำหนด
+            if not future.cancel():
+                logger.warning(f"/api/messages: chat call still running after {CHAT_TIMEOUT_SECONDS}s timeout; abandoning it")
+            current_time = iso_now()
+            assistant_payload = {
+                'role': 'assistant',
+                'text': 'ขออภัยค่ะ ระบบใช้เวลาประมวลผลนานเกินไป กรุณาลองใหม่อีกครั้งภายหลัง',
+                'structured_data': [],
+                'language': 'th',
+                'intent': None,
+                'source': 'timeout_fallback',
+                'createdAt': current_time,
+                'fallback': True,
+                'duplicate': False,
+            }
+            response_payload = {
+                'success': False,
+                'error': True,
+                'message': 'AI timeout',
+                'assistant': assistant_payload,
+                'data_status': None,
+                'duplicate': False,
+            }
+            return json_response(response_payload, 504)
         # --------------------------------------------------
+        response_text = result['response']
+    except (KeyError, ValueError, RuntimeError) as e:
+        logger.error(f"[ERROR] /api/messages failed: {e}")
+        return _post_message_error(str(e))
+    except Exception as e:
+        app.logger.exception("Error in /api/messages")
+        return _post_message_error(str(e))
+
+    current_time = iso_now()
+    error_message = result.get('gpt_error') or result.get('error')
+    error_flag = bool(error_message)
+
+    assistant_payload = {
+        'role': 'assistant',
+        'text': response_text,
+        'structured_data': result.get('structured_data', []),
+        'language': result.get('language', 'th'),
+        'intent': result.get('intent'),
+        'source': result.get('source'),
+        'createdAt': current_time,
+        'fallback': error_flag or result.get('source') in _FALLBACK_SOURCES,
+        'duplicate': result.get('duplicate', False),
+    }
 
-        current_time = datetime.datetime.now().isoformat()
-        error_message = result.get('gpt_error') or result.get('error')
-        error_flag = bool(error_message)
-
-        assistant_payload = {
-            'role': 'assistant',
-            'text': result['response'],
-            'structured_data': result.get('structured_data', []),
-            'language': result.get('language', 'th'),
-            'intent': result.get('intent'),
-            'source': result.get('source'),
-            'createdAt': current_time,
-            'fallback': error_flag or result.get('source') in {'simple_fallback', 'simple'},
-            'duplicate': result.get('duplicate', False),
-        }
+    response_payload = {
+        'success': not error_flag,
+        'error': error_flag,
+        'message': error_message,
+        'assistant': assistant_payload,
+        'data_status': result.get('data_status'),
+        'duplicate': result.get('duplicate', False),
+    }
 
-        response_payload = {
-            'success': not error_flag,
-            'error': error_flag,
-            'message': error_message,
-            'assistant': assistant_payload,
-            'data_status': result.get('data_status'),
-            'duplicate': result.get('duplicate', False),
-        }
+    return json_response(response_payload, 200)
+
+
+def _post_message_error(message: str) -> Response:
+    """500 response for /api/messages in the same envelope the frontend expects."""
+    current_time = iso_now()
+    assistant_payload = {
+        'role': 'assistant',
+        'text': '',
+        'structured_data': [],
+        'language': 'th',
+        'intent': None,
+        'source': 'error',
+        'createdAt': current_time,
+        'fallback': True,
+        'duplicate': False,
+    }
+    return json_response({
+        'success': False,
+        'error': True,
+        'message': message,
+        'assistant': assistant_payload,
+        'data_status': None,
+        'duplicate': False,
+    }, 500)
+
+
+# Rows fetched (and serialized) per round trip when building /api/places
+PLACES_STREAM_BATCH = 500
+# Clients may reuse /api/places this long before revalidating against the ETag
+PLACES_CACHE_MAX_AGE = 60
+# The last complete /api/places body is served from memory for this long
+# without touching the database at all. Stored as one (fetched_at, etag, body)
+# tuple that is only ever rebound, so readers never see a torn entry.
+PLACES_CACHE_TTL = float(os.getenv('PLACES_CACHE_TTL', '60'))
+_PLACES_CACHE: tuple[float, str, bytes] | None = None
+_PLACES_REFRESH_LOCK = threading.Lock()
+
+
+def _places_expired(cached: tuple[float, str, bytes] | None) -> bool:
+    return cached is None or time.monotonic() - cached[0] >= PLACES_CACHE_TTL
+
+
+def _places_response(etag: str, body: bytes) -> Response:
+    """304 for a matching If-None-Match, else ``body`` tagged with ``etag``."""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'public, max-age={PLACES_CACHE_MAX_AGE}'
+    return response
 
-        return jsonify(response_payload), 200
-
-    except Exception as e:
-        app.logger.exception("Error in /api/messages")
-        current_time = datetime.datetime.now().isoformat()
-        assistant_payload = {
-            'role': 'assistant',
-            'text': '',
-            'structured_data': [],
-            'language': 'th',
-            'intent': None,
-            'source': 'error',
-            'createdAt': current_time,
-            'fallback': True,
-            'duplicate': False,
-        }
-        return jsonify({
-            'success': False,
-            'error': True,
-            'message': str(e),
-            'assistant': assistant_payload,
-            'data_status': None,
-            'duplicate': False,
-        }), 500
 
+def _build_places_body(session) -> bytes:
+    """Serialize every place in one query, PLACES_STREAM_BATCH rows at a time."""
+    from backend.db import PLACE_COLUMNS, place_to_dict
+    from sqlalchemy import select
 
+    # Core rows straight off the cursor: no identity map or instance state.
+    # PLACE_COLUMNS leaves out the 384-dim embedding as well.
+    rows = session.execute(
+        select(*PLACE_COLUMNS).execution_options(yield_per=PLACES_STREAM_BATCH)
+    )
+    parts = [b'{"success":true,"places":[']
+    count = 0
+    for batch in rows.partitions():
+        parts.append((b',' if count else b'') + b','.join(json_dumps(place_to_dict(row)) for row in batch))
+        count += len(batch)
+    parts.append(b'],"count":%d}' % count)
+    logger.info(f"Retrieved {count} places from database")
+    return b''.join(parts)
 
 
 @app.route('/api/places', methods=['GET'])
 def get_all_places():
-    """Get all places from database for the Places page."""
-    try:
-        from backend.db import get_session_factory, Place
-        
-        session_factory = get_session_factory()
-        session = session_factory()
-        
-        try:
-            places = session.query(Place).all()
-            
-            all_places = [p.to_dict() for p in places]
-            
-            logger.info(f"Retrieved {len(all_places)} places from database")
-            
-            return jsonify({
-                'success': True,
-                'places': all_places,
-                'count': len(all_places)
-            })
-        finally:
-            session.close()
-    except Exception as e:
-        logger.error(f"[ERROR] /api/places failed: {e}", exc_info=True)
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'places': []
-        }), 500
+    """Get all places from database for the Places page.
+
+    The body is built from one query and kept for PLACES_CACHE_TTL seconds;
+    when it expires, a single request refreshes it. Its ETag is a hash of the
+    body itself, so revalidation never costs a database pass; a matching
+    If-None-Match gets a 304.
+    """
+    global _PLACES_CACHE
+    cached = _PLACES_CACHE
+    if _places_expired(cached):
+        # One request runs the refresh query; the rest keep serving the
+        # expired body meanwhile, or wait for it when nothing is cached yet
+        if _PLACES_REFRESH_LOCK.acquire(blocking=cached is None):
+            try:
+                cached = _PLACES_CACHE
+                if _places_expired(cached):
+                    from backend.db import get_scoped_session
+
+                    # Scoped per request; the teardown_appcontext hook closes it
+                    fetched_at = time.monotonic()
+                    body = _build_places_body(get_scoped_session()())
+                    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+                    cached = _PLACES_CACHE = (fetched_at, etag, body)
+            except Exception as e:
+                logger.error(f"[ERROR] /api/places failed: {e}", exc_info=True)
+                if cached is not None:
+                    # Better an expired list than none; the next request retries
+                    return _places_response(cached[1], cached[2])
+                return jsonify({
+                    'success': False,
+                    'error': str(e),
+                    'places': []
+                }), 500
+            finally:
+                _PLACES_REFRESH_LOCK.release()
+    return _places_response(cached[1], cached[2])
 
 
 @app.route('/api/places/<place_id>', methods=['GET'])
 def get_place_by_id(place_id: str):
     """Get a single place by ID for the Place detail page."""
     try:
-        from backend.db import get_session_factory, Place
-
-        session_factory = get_session_factory()
-        session = session_factory()
-
-        try:
-            place = session.query(Place).filter(Place.id == place_id).first()
-            if not place:
-                return jsonify({
-                    'success': False,
-                    'error': 'Place not found'
-                }), 404
+        from backend.db import get_scoped_session, Place
 
+        # Scoped per request; the teardown_appcontext hook closes it
+        session = get_scoped_session()()
+        place = session.query(Place).filter(Place.id == place_id).first()
+        if not place:
             return jsonify({
-                'success': True,
-                'place': place.to_dict()
-            })
-        finally:
-            session.close()
+                'success': False,
+                'error': 'Place not found'
+            }), 404
+
+        return jsonify({
+            'success': True,
+            'place': place.to_dict()
+        })
     except Exception as e:
         logger.error(f"[ERROR] /api/places/{place_id} failed: {e}", exc_info=True)
         return jsonify({
@@ -1439,22 +2384,18 @@ def get_place_by_id(place_id: str):
 def get_districts():
     """Get all unique districts from the places table."""
     try:
-        from backend.db import get_session_factory, Place
+        from backend.db import get_scoped_session, Place
 
-        session_factory = get_session_factory()
-        session = session_factory()
-
-        try:
-            # Get unique districts from the city column
-            districts = session.query(Place.city).distinct().filter(Place.city.isnot(None)).all()
-            district_list = [row[0] for row in districts if row[0]]
-            
-            return jsonify({
-                'success': True,
-                'districts': sorted(district_list)
-            })
-        finally:
-            session.close()
+        # Scoped per request; the teardown_appcontext hook closes it
+        session = get_scoped_session()()
+        # Get unique districts from the city column
+        districts = session.query(Place.city).distinct().filter(Place.city.isnot(None)).all()
+        district_list = [row[0] for row in districts if row[0]]
+        
+        return jsonify({
+            'success': True,
+            'districts': sorted(district_list)
+        })
     except Exception as e:
         logger.error(f"[ERROR] /api/filters/districts failed: {e}", exc_info=True)
         return jsonify({
@@ -1468,22 +2409,18 @@ def get_districts():
 def get_categories():
     """Get all unique categories from the places table."""
     try:
-        from backend.db import get_session_factory, Place
+        from backend.db import get_scoped_session, Place
 
-        session_factory = get_session_factory()
-        session = session_factory()
-
-        try:
-            # Get unique categories
-            categories = session.query(Place.category).distinct().filter(Place.category.isnot(None)).all()
-            category_list = [row[0] for row in categories if row[0]]
-            
-            return jsonify({
-                'success': True,
-                'categories': sorted(category_list)
-            })
-        finally:
-            session.close()
+        # Scoped per request; the teardown_appcontext hook closes it
+        session = get_scoped_session()()
+        # Get unique categories
+        categories = session.query(Place.category).distinct().filter(Place.category.isnot(None)).all()
+        category_list = [row[0] for row in categories if row[0]]
+        
+        return jsonify({
+            'success': True,
+            'categories': sorted(category_list)
+        })
     except Exception as e:
         logger.error(f"[ERROR] /api/filters/categories failed: {e}", exc_info=True)
         return jsonify({
@@ -1493,170 +2430,215 @@ def get_categories():
         }), 500
 
 
-# Feedback endpoint is handled by backend/api/feedback.py (feedback_api_bp)
-# Adding explicit route to ensure it's recognized by Flask
-@app.route('/api/feedback', methods=['POST'])
-def api_feedback_handler():
-    """Delegate to the feedback blueprint."""
-    from backend.api.feedback import save_feedback
-    return save_feedback()
+# Firebase web config snapshot; only the variables that are actually set
+FIREBASE_CONFIG = {
+    key: value
+    for key, env_name in FIREBASE_ENV_MAP.items()
+    if (value := os.getenv(env_name))
+}
 
 
-@app.route('/api/feedback/stats', methods=['GET'])
-def get_feedback_stats():
-    """Get statistics about AI response feedback."""
-    try:
-        from backend.db import get_session_factory, MessageFeedback
-        from sqlalchemy import func
-        
-        session_factory = get_session_factory()
-        session = session_factory()
-        
-        try:
-            # Overall stats
-            total_feedback = session.query(MessageFeedback).count()
-            likes = session.query(MessageFeedback).filter_by(feedback_type='like').count()
-            dislikes = session.query(MessageFeedback).filter_by(feedback_type='dislike').count()
-            
-            # Stats by source
-            source_stats = session.query(
-                MessageFeedback.source,
-                MessageFeedback.feedback_type,
-                func.count(MessageFeedback.id)
-            ).group_by(MessageFeedback.source, MessageFeedback.feedback_type).all()
-            
-            # Stats by intent
-            intent_stats = session.query(
-                MessageFeedback.intent,
-                MessageFeedback.feedback_type,
-                func.count(MessageFeedback.id)
-            ).group_by(MessageFeedback.intent, MessageFeedback.feedback_type).all()
-            
-            # Recent dislikes with comments
-            recent_dislikes = session.query(MessageFeedback).filter(
-                MessageFeedback.feedback_type == 'dislike',
-                MessageFeedback.feedback_comment != ''
-            ).order_by(MessageFeedback.created_at.desc()).limit(10).all()
-            
-            satisfaction_rate = (likes / total_feedback * 100) if total_feedback > 0 else 0
-            
-            return jsonify({
-                'success': True,
-                'stats': {
-                    'total_feedback': total_feedback,
-                    'likes': likes,
-                    'dislikes': dislikes,
-                    'satisfaction_rate': round(satisfaction_rate, 2),
-                    'by_source': [
-                        {'source': s, 'feedback_type': f, 'count': c}
-                        for s, f, c in source_stats
-                    ],
-                    'by_intent': [
-                        {'intent': i, 'feedback_type': f, 'count': c}
-                        for i, f, c in intent_stats
-                    ],
-                    'recent_issues': [fb.to_dict() for fb in recent_dislikes]
-                }
-            })
-            
-        finally:
-            session.close()
-            
-    except Exception as e:
-        logger.error(f"Feedback stats endpoint error: {e}", exc_info=True)
-        return jsonify({'error': 'Internal server error'}), 500
+def _build_firebase_body() -> str:
+    """Render firebase_config.js from FIREBASE_CONFIG."""
+    if not FIREBASE_CONFIG.get('apiKey'):
+        return "console.warn('Firebase configuration missing; auth disabled.');\nwindow.FIREBASE_CONFIG = null;"
+    return f"window.FIREBASE_CONFIG = {json.dumps(FIREBASE_CONFIG, ensure_ascii=False)};"
+
+
+# Environment variables are fixed for the life of the process, so the body is
+# encoded once and carries a content ETag for cheap revalidation
+_FIREBASE_BODY = _build_firebase_body().encode('utf-8')
+_FIREBASE_ETAG = hashlib.blake2b(_FIREBASE_BODY, digest_size=16).hexdigest()
 
 
 @app.route('/firebase_config.js')
 def firebase_config():
-    config = {}
-    for key, env_name in FIREBASE_ENV_MAP.items():
-        value = os.getenv(env_name)
-        if value:
-            config[key] = value
-
-    if not config.get('apiKey'): 
-        body = "console.warn('Firebase configuration missing; auth disabled.');\nwindow.FIREBASE_CONFIG = null;"
-    else:
-        body = f"window.FIREBASE_CONFIG = {json.dumps(config, ensure_ascii=False)};"
+    response = Response(_FIREBASE_BODY, mimetype='application/javascript')
+    # Short max-age: a redeploy with new Firebase settings shows up within minutes
+    response.headers['Cache-Control'] = 'public, max-age=300'
+    response.set_etag(_FIREBASE_ETAG)
+    return response.make_conditional(request)
 
-    response = Response(body, mimetype='application/javascript')
-    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-    return response
 
 
+@app.route('/favicon.ico')
+def favicon():
+    cached = _serve_cached('favicon.ico')
+    if cached is not None:
+        return cached
+    found = _find_static_file('favicon.ico')
+    if found:
+        folder, fname = found
+        return _send_static(folder, fname)
+    abort(404)
+
+
+# Prefixes that must 404 instead of falling through to the SPA shell
+_is_reserved_path = re.compile(r'(?:api|assets|static)/|firebase_config\.js').match
+
 
 @app.route('/<path:path>')
 def spa_fallback(path: str):
     # 1. Try to find the file in static roots first (e.g., models/, images/)
+    cached = _serve_cached(path)
+    if cached is not None:
+        return cached
     found = _find_static_file(path)
     if found:
         folder, fname = found
-        return send_from_directory(folder, path)
+        return _send_static(folder, path)
 
-    if path == 'favicon.ico':
-        found = _find_static_file('favicon.ico')
-        if found:
-            folder, fname = found
-            return send_from_directory(folder, fname)
-        abort(404)
-        
-    if path.startswith(('api/', 'assets/', 'static/', 'firebase_config.js')):
+    if _is_reserved_path(path):
         abort(404)
         
     # 2. If not found and not a reserved path, serve index.html for SPA routing
-    found = _find_static_file('index.html')
+    cached = _serve_cached('index.html')
+    if cached is not None:
+        return cached
+    found = _index_location()
     if found:
         folder, fname = found
-        return send_from_directory(folder, fname)
+        return _send_static(folder, fname)
     abort(404)
 
+# ---------------------------------------------------------------------------
+# Image proxy
+# ---------------------------------------------------------------------------
+# One pooled session for every proxied image: keep-alive connections to the
+# Google image hosts are reused, so only the first request pays the TLS handshake.
+IMAGE_PROXY_CHUNK_BYTES = 64 * 1024
+_IMG_SESSION = requests.Session()
+_IMG_SESSION.mount('https://', HTTPAdapter(pool_connections=10, pool_maxsize=50, max_retries=Retry(total=2)))
+# Upstream validators passed through so browsers and CDNs can revalidate
+_IMAGE_PROXY_FORWARDED_HEADERS = ('Last-Modified', 'ETag')
+_IMAGE_PROXY_CACHE_CONTROL = 'public, max-age=86400'  # Cache for 24 hours
+
+# Recently proxied images keyed on URL, so repeat requests (every card on the
+# places page, every client) skip the upstream fetch. Bounded by total bytes,
+# LRU order, same scheme as the TTS cache.
+IMAGE_PROXY_CACHE_MAX_BYTES = int(os.getenv('IMAGE_PROXY_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+_IMAGE_CACHE: OrderedDict = OrderedDict()  # url -> (etag, content_type, last_modified, body)
+_IMAGE_CACHE_SIZE = 0
+_IMAGE_CACHE_LOCK = threading.Lock()
+
+
+def _image_cache_get(url: str) -> tuple | None:
+    with _IMAGE_CACHE_LOCK:
+        entry = _IMAGE_CACHE.get(url)
+        if entry is not None:
+            _IMAGE_CACHE.move_to_end(url)
+        return entry
+
+
+def _image_cache_put(url: str, etag: str | None, content_type: str, last_modified: str | None, body: bytes) -> None:
+    global _IMAGE_CACHE_SIZE
+    if not body or len(body) > IMAGE_PROXY_CACHE_MAX_BYTES // 4:
+        return
+    if not etag:
+        etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+    with _IMAGE_CACHE_LOCK:
+        previous = _IMAGE_CACHE.pop(url, None)
+        if previous is not None:
+            _IMAGE_CACHE_SIZE -= len(previous[3])
+        _IMAGE_CACHE[url] = (etag, content_type, last_modified, body)
+        _IMAGE_CACHE_SIZE += len(body)
+        while _IMAGE_CACHE_SIZE > IMAGE_PROXY_CACHE_MAX_BYTES:
+            _, evicted = _IMAGE_CACHE.popitem(last=False)
+            _IMAGE_CACHE_SIZE -= len(evicted[3])
+
+
+def _cache_image_stream(chunks, url: str, etag: str | None, content_type: str, last_modified: str | None):
+    """Pass image chunks through, caching the whole body once the stream completes."""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    _image_cache_put(url, etag, content_type, last_modified, b''.join(parts))
+
+
+def _cached_image_response(entry: tuple) -> Response:
+    """Serve a cached image, or 304 when the client's copy is current."""
+    etag, content_type, last_modified, body = entry
+    # ETag values are stored quoted, exactly as they go on the wire
+    if request.if_none_match.contains_weak(etag.strip('"').removeprefix('W/"')):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype=content_type)
+    response.headers['ETag'] = etag
+    if last_modified:
+        response.headers['Last-Modified'] = last_modified
+    response.headers['Cache-Control'] = _IMAGE_PROXY_CACHE_CONTROL
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return response
+
+
+# Hosts the proxy will fetch from (a tuple, so one str.startswith call checks all)
+_IMAGE_PROXY_ALLOWED_PREFIXES = (
+    'https://lh3.googleusercontent.com',
+    'https://maps.googleapis.com',
+    'https://lh5.googleusercontent.com',
+    'https://streetviewpixels-pa.googleapis.com',
+)
+
+# Enhanced headers to bypass Google's blocks, tried in order
+_IMAGE_PROXY_HEADER_SETS = (
+    {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
+        'Referer': 'https://www.google.com/',
+    },
+    {
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/605.1.15',
+        'Accept': 'image/*,*/*;q=0.8',
+        'Referer': 'https://maps.google.com/',
+    },
+    {
+        'User-Agent': 'Googlebot-Image/1.0',
+    },
+)
+
+
 @app.route('/api/image-proxy', methods=['GET'])
 def image_proxy():
     """Proxy endpoint to serve Google Maps images and bypass CORS/403 restrictions."""
     try:
-        import requests
-        from io import BytesIO
-        
         image_url = request.args.get('url')
         if not image_url:
             return jsonify({'error': 'URL parameter required'}), 400
         
         # Security: Only allow Google image URLs
-        allowed_prefixes = [
-            'https://lh3.googleusercontent.com',
-            'https://maps.googleapis.com',
-            'https://lh5.googleusercontent.com',
-            'https://streetviewpixels-pa.googleapis.com'
-        ]
-        
-        if not any(image_url.startswith(prefix) for prefix in allowed_prefixes):
+        if not image_url.startswith(_IMAGE_PROXY_ALLOWED_PREFIXES):
             return jsonify({'error': 'Only Google image URLs are allowed'}), 403
         
-        # Enhanced headers to bypass Google's blocks
-        headers_list = [
-            {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'image/avif,image/webp,image/apng,image/svg+xml,image/*,*/*;q=0.8',
-                'Referer': 'https://www.google.com/',
-            },
-            {
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/605.1.15',
-                'Accept': 'image/*,*/*;q=0.8',
-                'Referer': 'https://maps.google.com/',
-            },
-            {
-                'User-Agent': 'Googlebot-Image/1.0',
-            }
-        ]
+        cached = _image_cache_get(image_url)
+        if cached is not None:
+            return _cached_image_response(cached)
+        
+        # Let upstream answer 304 for a copy the client already holds
+        conditional = {
+            name: request.headers[name]
+            for name in ('If-None-Match', 'If-Modified-Since')
+            if name in request.headers
+        }
         
         # Try different headers
         response = None
-        for headers in headers_list:
+        for headers in _IMAGE_PROXY_HEADER_SETS:
             try:
-                response = requests.get(image_url, headers=headers, timeout=10, stream=True, allow_redirects=True)
+                response = _IMG_SESSION.get(image_url, headers={**headers, **conditional}, timeout=10, stream=True, allow_redirects=True)
+                if response.status_code == 304:
+                    not_modified = Response(status=304)
+                    for name in _IMAGE_PROXY_FORWARDED_HEADERS:
+                        if response.headers.get(name):
+                            not_modified.headers[name] = response.headers[name]
+                    not_modified.headers['Cache-Control'] = _IMAGE_PROXY_CACHE_CONTROL
+                    not_modified.headers['Access-Control-Allow-Origin'] = '*'
+                    response.close()
+                    return not_modified
                 if response.status_code == 200:
                     break
+                # Hand the connection back to the pool before the next attempt
+                response.close()
             except requests.RequestException:
                 continue
         
@@ -1679,16 +2661,30 @@ def image_proxy():
         
         # Determine content type
         content_type = response.headers.get('Content-Type', 'image/jpeg')
-        
-        # Stream the image back to the client
-        return Response(
-            response.content,
+        headers = {
+            'Cache-Control': _IMAGE_PROXY_CACHE_CONTROL,
+            'Access-Control-Allow-Origin': '*'
+        }
+        for name in _IMAGE_PROXY_FORWARDED_HEADERS:
+            value = response.headers.get(name)
+            if value:
+                headers[name] = value
+        # iter_content decodes any Content-Encoding, so the upstream length
+        # only matches what we send for an unencoded body
+        if 'Content-Encoding' not in response.headers and response.headers.get('Content-Length'):
+            headers['Content-Length'] = response.headers['Content-Length']
+        
+        # Stream the image back to the client chunk by chunk
+        proxied = Response(
+            _cache_image_stream(
+                response.iter_content(chunk_size=IMAGE_PROXY_CHUNK_BYTES), image_url,
+                response.headers.get('ETag'), content_type, response.headers.get('Last-Modified'),
+            ),
             mimetype=content_type,
-            headers={
-                'Cache-Control': 'public, max-age=86400',  # Cache for 24 hours
-                'Access-Control-Allow-Origin': '*'
-            }
+            headers=headers
         )
+        proxied.call_on_close(response.close)
+        return proxied
     except Exception as e:
         logger.error(f"Image proxy error: {e}")
         # Return placeholder on error
@@ -1702,6 +2698,13 @@ def image_proxy():
             headers={'Access-Control-Allow-Origin': '*'}
         )
 
+# Warm the chatbot singleton in the background once the module has finished
+# importing. Gunicorn imports app.py in each worker after fork, so every worker
+# pays the DB load at boot rather than on its first /api/messages/stream call.
+if os.getenv('PRELOAD_CHATBOT', '1').lower() in ('1', 'true', 'yes'):
+    threading.Thread(target=get_chatbot, name='chatbot-preload', daemon=True).start()
+
+
 if __name__ == '__main__':
     logger.info("="*60)
     logger.info("Samut Songkhram Travel Assistant - Starting")
@@ -1720,6 +2723,12 @@ if __name__ == '__main__':
         try:
             logger.info("Preloading semantic model...")
             from backend.semantic_search import get_model, get_embeddings
+            try:
+                import torch
+                # Let the first-boot encode use every core for the BLAS matmuls
+                torch.set_num_threads(os.cpu_count() or 4)
+            except ImportError:
+                pass
             get_model()  # Load the SentenceTransformer model (~2-3 seconds)
             get_embeddings()  # Precompute embeddings (~2-3 seconds)
             logger.info("✓ Semantic model preloaded successfully")
@@ -1735,7 +2744,9 @@ if __name__ == '__main__':
     except Exception as e:
         logger.warning(f"Could not start preload thread: {e}")
     
-    logger.info("Starting Flask server on 0.0.0.0:8000")
+    # Local development only - production runs gunicorn with gevent workers
+    # (see gunicorn.conf.py)
+    logger.info("Starting Flask development server on 0.0.0.0:8000")
     
     try:
         app.run(host="0.0.0.0", port=8000, debug=False, use_reloader=False, threaded=True)
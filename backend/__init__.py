@@ -1,14 +1,18 @@
 ﻿
 # world_journey_ai/__init__.py
-from flask import Flask
-from flask_cors import CORS
+# This package __init__ runs before every ``backend.*`` import, including the
+# standalone DB scripts, so Flask is only imported when an app is actually built.
 
 # ถ้ามี blueprint หรือ route แยกไฟล์
 # from .routes.main import bp as main_bp
 
 def create_app():
+    from flask import Flask
+    from flask_cors import CORS
+
     app = Flask(__name__)
-    CORS(app)
+    # Only the JSON API is called cross-origin; static routes skip the CORS pass
+    CORS(app, resources={r"/api/*": {"origins": "*"}}, max_age=86400)
 
     # register blueprint ตรงนี้ ถ้ามี
     # app.register_blueprint(main_bp)
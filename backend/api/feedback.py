@@ -1,10 +1,120 @@
 """Feedback API endpoints - Handle AI response feedback (like/dislike)."""
 
+import logging
+import os
+import threading
+import time
 from flask import Blueprint, request, jsonify
 from datetime import datetime
 
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+try:
+    from backend.db import FEEDBACK_CHAT_LOG_ID_INDEX, MessageFeedback, get_scoped_session, index_is_valid
+except ImportError as exc:  # pragma: no cover - DB layer missing at runtime
+    logger.warning(f"Feedback API running without database: {exc}")
+    MessageFeedback = None  # type: ignore
+    get_scoped_session = None  # type: ignore
+
 feedback_api_bp = Blueprint('feedback_api', __name__, url_prefix='/api/feedback')
 
+VALID_FEEDBACK_TYPES = frozenset({'like', 'dislike'})
+
+# The upsert's ON CONFLICT (chat_log_id) needs the unique index that the deploy
+# migration (backend.db_migrations) builds. Until it has been seen valid, votes
+# go through select-then-write and the index is looked up again at most once
+# per UPSERT_RECHECK_SECONDS, so a finished migration is picked up without a
+# restart.
+UPSERT_RECHECK_SECONDS = 60
+_UPSERT_READY = False
+_UPSERT_CHECKED_AT = float('-inf')
+
+
+# Stats barely move between adjacent requests: serve them from memory for
+# FEEDBACK_STATS_TTL_SECONDS. save_feedback drops the entry, so a vote shows up
+# at once in this worker.
+FEEDBACK_STATS_TTL_SECONDS = int(os.getenv("FEEDBACK_STATS_TTL_SECONDS", "60"))
+_STATS_CACHE = None  # (computed_at, stats dict) or None
+_STATS_GENERATION = 0  # Bumped per saved vote, so a stale result is never stored
+_STATS_LOCK = threading.Lock()
+
+
+def _invalidate_stats_cache():
+    global _STATS_CACHE, _STATS_GENERATION
+    with _STATS_LOCK:
+        _STATS_CACHE = None
+        _STATS_GENERATION += 1
+
+
+def _upsert_available(session) -> bool:
+    global _UPSERT_READY, _UPSERT_CHECKED_AT
+    if _UPSERT_READY:
+        return True
+    now = time.monotonic()
+    if now - _UPSERT_CHECKED_AT < UPSERT_RECHECK_SECONDS:
+        return False
+    _UPSERT_CHECKED_AT = now
+    _UPSERT_READY = index_is_valid(session, FEEDBACK_CHAT_LOG_ID_INDEX)
+    if _UPSERT_READY:
+        logger.info("Feedback saves switched to INSERT ... ON CONFLICT")
+    return _UPSERT_READY
+
+
+def _upsert_feedback(session, values: dict) -> tuple[int, bool]:
+    """Insert or update the vote for ``values['chat_log_id']``; returns (id, is_update).
+
+    One atomic round trip: two concurrent votes for the same chat_log_id can
+    not both insert. xmax is 0 only on a freshly inserted row version.
+    """
+    stmt = pg_insert(MessageFeedback).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[MessageFeedback.chat_log_id],
+        set_={
+            'feedback_type': stmt.excluded.feedback_type,
+            'feedback_comment': stmt.excluded.feedback_comment,
+            'user_id': stmt.excluded.user_id,
+            'message_id': stmt.excluded.message_id,
+        },
+    ).returning(MessageFeedback.id, literal_column('xmax = 0'))
+    feedback_id, inserted = session.execute(stmt).one()
+    session.commit()
+    return feedback_id, not inserted
+
+
+def _select_then_write_feedback(session, values: dict) -> tuple[int, bool]:
+    """Pre-migration path: look the vote up, then UPDATE or INSERT it."""
+    existing_feedback = session.scalar(
+        select(MessageFeedback).where(
+            MessageFeedback.chat_log_id == values['chat_log_id']
+        )
+    )
+    if existing_feedback:
+        existing_feedback.feedback_type = values['feedback_type']
+        existing_feedback.feedback_comment = values['feedback_comment']
+        existing_feedback.user_id = values['user_id']
+        existing_feedback.message_id = values['message_id']
+        session.commit()
+        return existing_feedback.id, True
+    new_feedback = MessageFeedback(**values)
+    session.add(new_feedback)
+    session.commit()
+    return new_feedback.id, False
+
+
+def _parse_chat_log_id(value):
+    """Return ``value`` as a positive int, or None if it is not one."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value if value > 0 else None
+    if isinstance(value, str) and value.isdigit():
+        return int(value) or None
+    return None
+
 
 @feedback_api_bp.route('', methods=['POST'])
 def save_feedback():
@@ -19,19 +129,25 @@ def save_feedback():
     
     If feedback already exists for this chat_log_id, it will be updated (not duplicated).
     """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        data = {}
+
+    chat_log_id = _parse_chat_log_id(data.get('chat_log_id'))
+    feedback_type = data.get('type', 'like')  # 'like' or 'dislike'
+    comment = data.get('comment') or ''
+
+    if chat_log_id is None:
+        return jsonify({'success': False, 'error': 'chat_log_id is required'}), 400
+    if not isinstance(feedback_type, str) or feedback_type not in VALID_FEEDBACK_TYPES:
+        return jsonify({'success': False, 'error': "type must be 'like' or 'dislike'"}), 400
+    if not isinstance(comment, str):
+        return jsonify({'success': False, 'error': 'comment must be a string'}), 400
+
+    if MessageFeedback is None:
+        return jsonify({'success': False, 'error': 'Database unavailable'}), 503
+
     try:
-        from backend.db import MessageFeedback, get_session_factory
-        from sqlalchemy import select
-        
-        data = request.get_json(silent=True) or {}
-        
-        chat_log_id = data.get('chat_log_id')
-        feedback_type = data.get('type', 'like')  # 'like' or 'dislike'
-        comment = data.get('comment', '')
-        
-        if not chat_log_id:
-            return jsonify({'success': False, 'error': 'chat_log_id is required'}), 400
-        
         # Get user_id if authenticated
         user_id = 'anonymous'
         try:
@@ -43,45 +159,28 @@ def save_feedback():
         except Exception:
             pass
         
-        session_factory = get_session_factory()
-        with session_factory() as session:
-            # Use chat_log_id as the unique identifier
-            message_id_str = str(chat_log_id)
-            
-            # Check if feedback already exists for this chat_log_id
-            existing_feedback = session.scalar(
-                select(MessageFeedback).where(
-                    MessageFeedback.chat_log_id == chat_log_id
-                )
-            )
-            
-            if existing_feedback:
-                # Update existing feedback
-                print(f"[INFO] Updating existing feedback for chat_log_id={chat_log_id}")
-                existing_feedback.feedback_type = feedback_type
-                existing_feedback.feedback_comment = comment
-                existing_feedback.user_id = user_id
-                existing_feedback.message_id = message_id_str
-                session.commit()
-                feedback_id = existing_feedback.id
-                is_update = True
-                print(f"[OK] Feedback updated: id={feedback_id}, type={feedback_type}")
-            else:
-                # Create new feedback
-                print(f"[INFO] Creating new feedback for chat_log_id={chat_log_id}")
-                new_feedback = MessageFeedback(
-                    message_id=message_id_str,
-                    user_id=user_id,
-                    feedback_type=feedback_type,
-                    feedback_comment=comment,
-                    chat_log_id=chat_log_id,
-                )
-                session.add(new_feedback)
-                session.commit()
-                feedback_id = new_feedback.id
-                is_update = False
-                print(f"[OK] Feedback created: id={feedback_id}, type={feedback_type}")
-        
+        # Scoped per request; the app's teardown hook closes it
+        session = get_scoped_session()()
+        # Use chat_log_id as the unique identifier
+        message_id_str = str(chat_log_id)
+
+        values = {
+            'message_id': message_id_str,
+            'user_id': user_id,
+            'feedback_type': feedback_type,
+            'feedback_comment': comment,
+            'chat_log_id': chat_log_id,
+        }
+        if _upsert_available(session):
+            feedback_id, is_update = _upsert_feedback(session, values)
+        else:
+            feedback_id, is_update = _select_then_write_feedback(session, values)
+        _invalidate_stats_cache()
+        logger.info(
+            f"Feedback {'updated' if is_update else 'created'}: id={feedback_id}, "
+            f"chat_log_id={chat_log_id}, type={feedback_type}"
+        )
+
         return jsonify({
             'success': True,
             'feedback_id': feedback_id,
@@ -89,46 +188,90 @@ def save_feedback():
             'is_update': is_update
         }), 201 if not is_update else 200
         
+    except SQLAlchemyError as e:
+        logger.error(f"Feedback save failed: {e}")
+        return jsonify({'success': False, 'error': str(e)}), 500
     except Exception as e:
-        print(f"[ERROR] Feedback save failed: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Feedback save failed")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
+def _compute_feedback_stats(session) -> dict:
+    """Totals plus per-source/per-intent counts, folded from one GROUP BY.
+
+    The only other round trip is the recent-dislikes lookup, served by
+    ix_message_feedback_type_created.
+    """
+    grouped = session.execute(
+        select(
+            MessageFeedback.source,
+            MessageFeedback.intent,
+            MessageFeedback.feedback_type,
+            func.count(MessageFeedback.id),
+        ).group_by(MessageFeedback.source, MessageFeedback.intent, MessageFeedback.feedback_type)
+    ).all()
+
+    likes = dislikes = 0
+    source_counts: dict = {}
+    intent_counts: dict = {}
+    for source, intent, feedback_type, count in grouped:
+        if feedback_type == 'like':
+            likes += count
+        elif feedback_type == 'dislike':
+            dislikes += count
+        source_key = (source, feedback_type)
+        intent_key = (intent, feedback_type)
+        source_counts[source_key] = source_counts.get(source_key, 0) + count
+        intent_counts[intent_key] = intent_counts.get(intent_key, 0) + count
+
+    # Recent dislikes with comments
+    recent_dislikes = session.scalars(
+        select(MessageFeedback)
+        .where(MessageFeedback.feedback_type == 'dislike', MessageFeedback.feedback_comment != '')
+        .order_by(MessageFeedback.created_at.desc())
+        .limit(10)
+    ).all()
+
+    total = likes + dislikes
+    return {
+        'likes': likes,
+        'dislikes': dislikes,
+        'total': total,
+        'satisfaction_rate': round((likes / total * 100), 1) if total > 0 else 0,
+        'by_source': [
+            {'source': s, 'feedback_type': f, 'count': c}
+            for (s, f), c in source_counts.items()
+        ],
+        'by_intent': [
+            {'intent': i, 'feedback_type': f, 'count': c}
+            for (i, f), c in intent_counts.items()
+        ],
+        'recent_issues': [fb.to_dict() for fb in recent_dislikes],
+    }
+
+
 @feedback_api_bp.route('/stats', methods=['GET'])
 def get_feedback_stats():
-    """Get feedback statistics."""
+    """Get feedback statistics (cached for FEEDBACK_STATS_TTL_SECONDS)."""
+    global _STATS_CACHE
+    if MessageFeedback is None:
+        return jsonify({'error': 'Database unavailable'}), 503
+
+    with _STATS_LOCK:
+        cached = _STATS_CACHE
+        generation = _STATS_GENERATION
+    if cached is not None and time.monotonic() - cached[0] < FEEDBACK_STATS_TTL_SECONDS:
+        return jsonify(cached[1]), 200
+
     try:
-        from backend.db import MessageFeedback, get_session_factory
-        from sqlalchemy import func, select
-        
-        session_factory = get_session_factory()
-        with session_factory() as session:
-            # Count likes
-            likes = session.scalar(
-                select(func.count(MessageFeedback.id)).where(
-                    MessageFeedback.feedback_type == 'like'
-                )
-            ) or 0
-            
-            # Count dislikes
-            dislikes = session.scalar(
-                select(func.count(MessageFeedback.id)).where(
-                    MessageFeedback.feedback_type == 'dislike'
-                )
-            ) or 0
-        
-        total = likes + dislikes
-        satisfaction_rate = round((likes / total * 100), 1) if total > 0 else 0
-        
-        return jsonify({
-            'likes': likes,
-            'dislikes': dislikes,
-            'total': total,
-            'satisfaction_rate': satisfaction_rate
-        }), 200
+        computed_at = time.monotonic()
+        session = get_scoped_session()()
+        stats = _compute_feedback_stats(session)
+        with _STATS_LOCK:
+            if generation == _STATS_GENERATION:
+                _STATS_CACHE = (computed_at, stats)
+        return jsonify(stats), 200
         
     except Exception as e:
-        print(f"[ERROR] Feedback stats failed: {e}")
+        logger.exception("Feedback stats failed")
         return jsonify({'error': str(e)}), 500
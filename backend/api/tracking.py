@@ -1,9 +1,10 @@
 """Tracking API endpoints - Log user activities and events."""
 
-import json
 import requests
 from flask import Blueprint, request, jsonify
 
+from backend.json_utils import dumps as json_dumps
+
 tracking_api_bp = Blueprint('tracking_api', __name__, url_prefix='/api/tracking')
 
 # GeoIP cache to avoid hitting API too frequently
@@ -88,7 +89,7 @@ def log_user_action():
             details['geo'] = geo_data
         
         # Convert details dict to JSON string for meta_data column
-        meta_data = json.dumps(details) if details else None
+        meta_data = json_dumps(details).decode('utf-8') if details else None
         
         # Get user_id if authenticated
         user_id = None
@@ -8,6 +8,7 @@ import json
 import logging
 import os
 import re
+import threading
 import time
 from typing import Any, Dict, List, Optional, TYPE_CHECKING
 
@@ -23,11 +24,14 @@ from .db import (
     ChatLog,
     get_session_factory
 )
+
+logger = logging.getLogger(__name__)
+
 try:
     from .services.database import get_db_service
     DB_SERVICE_AVAILABLE = True
 except Exception as exc:
-    print(f"[WARN] Database service unavailable for adaptive flow: {exc}")
+    logger.warning(f"Database service unavailable for adaptive flow: {exc}")
     DB_SERVICE_AVAILABLE = False
 
     # Provide stub to keep symbol bound for static analysis / linters.
@@ -39,7 +43,7 @@ try:
     from .gpt_service import GPTService
     GPT_AVAILABLE = True
 except Exception as exc:
-    print(f"[WARN] GPT service import failed: {exc}")
+    logger.warning(f"GPT service import failed: {exc}")
     GPT_AVAILABLE = False
     GPTService = None
 
@@ -47,7 +51,7 @@ try:
     from .simple_matcher import FlexibleMatcher
     FLEXIBLE_MATCHER_AVAILABLE = True
 except Exception as exc:
-    print(f"[WARN] Flexible matcher unavailable: {exc}")
+    logger.warning(f"Flexible matcher unavailable: {exc}")
     FLEXIBLE_MATCHER_AVAILABLE = False
     FlexibleMatcher = None
 
@@ -65,11 +69,22 @@ from .constants import (
     DEFAULT_KEYWORD_DETECTION_LIMIT,
     LOCAL_KEYWORDS as DEFAULT_LOCAL_KEYWORDS,
 )
-from .text_utils import detect_language, normalize_whitespace
+from .pool_utils import default_pool_size
+from .text_utils import detect_language, normalize_whitespace, text_digest
 
 PROMPT_REPO = PromptRepo()
 
-logger = logging.getLogger(__name__)
+# Shared pool for the blocking side-calls (Google Maps, DB ping, parallel query
+# analysis). A per-call ``with ThreadPoolExecutor()`` spawned threads on every
+# request and its shutdown(wait=True) blocked past the timeout we asked for.
+# Sized like app.py's _GPT_POOL: every request submits here, so a smaller pool
+# would queue them, and a queued DB ping times out and drops the answer to the
+# no-DB path exactly under load. A call that times out is not interrupted; it
+# keeps its slot until it returns on its own.
+_IO_EXECUTOR = concurrent.futures.ThreadPoolExecutor(
+    max_workers=int(os.getenv("CHAT_IO_POOL_SIZE", str(default_pool_size()))),
+    thread_name_prefix="chat-io",
+)
 
 # ====== PERFORMANCE OPTIMIZATION: Module-level caches ======
 _TRAVEL_DATA_CACHE: Optional[List[Dict[str, Any]]] = None
@@ -82,8 +97,8 @@ _RESPONSE_CACHE: Dict[str, Dict[str, Any]] = {}  # Query hash -> response
 _RESPONSE_CACHE_TIME: Dict[str, float] = {}  # Query hash -> timestamp
 
 # Query result cache - stores search results to avoid repeated database queries
-_QUERY_RESULT_CACHE: Dict[str, List[Dict[str, Any]]] = {}  # Query hash -> search results
-_QUERY_RESULT_CACHE_TIME: Dict[str, float] = {}  # Query hash -> timestamp
+_QUERY_RESULT_CACHE: Dict[int, List[Dict[str, Any]]] = {}  # Query digest -> search results
+_QUERY_RESULT_CACHE_TIME: Dict[int, float] = {}  # Query digest -> timestamp
 _QUERY_RESULT_CACHE_TTL = 300  # 5 minutes
 
 LOCAL_KEYWORDS = PROMPT_REPO.get_prompt("chatbot/local_terms", default=DEFAULT_LOCAL_KEYWORDS)
@@ -129,12 +144,12 @@ class TravelChatbot:
         if GPT_AVAILABLE and GPTService is not None:
             try:
                 self.gpt_service = GPTService()
-                print("[OK] GPT service initialized")
+                logger.info("GPT service initialized")
             except Exception as exc:
-                print(f"[ERROR] Cannot initialize GPT service: {exc}")
+                logger.error(f"Cannot initialize GPT service: {exc}")
                 self.gpt_service = None
         else:
-            print("[WARN] GPT service unavailable")
+            logger.warning("GPT service unavailable")
 
     def _init_matcher(self) -> Optional[FlexibleMatcherType]:
         global _MATCHER_CACHE, _MATCHER_CACHE_INITIALIZED
@@ -151,7 +166,7 @@ class TravelChatbot:
             _MATCHER_CACHE_INITIALIZED = True
             return _MATCHER_CACHE
         except Exception as exc:
-            print(f"[WARN] Cannot initialize flexible matcher: {exc}")
+            logger.warning(f"Cannot initialize flexible matcher: {exc}")
             _MATCHER_CACHE = None
             _MATCHER_CACHE_INITIALIZED = True
             return None
@@ -238,18 +253,18 @@ class TravelChatbot:
         try:
             topic, confidence = engine.find_best_match(query)
         except Exception as exc:
-            print(f"[WARN] Flexible matcher topic detection failed: {exc}")
+            logger.warning(f"Flexible matcher topic detection failed: {exc}")
         try:
             is_local = engine.is_samutsongkhram_related(query)
         except Exception as exc:
-            print(f"[WARN] Flexible matcher locality detection failed: {exc}")
+            logger.warning(f"Flexible matcher locality detection failed: {exc}")
             is_local = False
         keywords: List[str] = []
         if topic:
             try:
                 keywords = engine.get_topic_keywords(topic)
             except Exception as exc:
-                print(f"[WARN] Flexible matcher keywords failed: {exc}")
+                logger.warning(f"Flexible matcher keywords failed: {exc}")
         # Ensure primitive types for downstream JSON serialization
         safe_topic = topic if isinstance(topic, str) else (str(topic) if topic else None)
         safe_confidence = float(confidence or 0.0)
@@ -366,7 +381,7 @@ class TravelChatbot:
             for place in places:
                 entries.append(place.to_dict())
         except Exception as e:
-            print(f"[ERROR] Failed to load data from DB: {e}")
+            logger.error(f"Failed to load data from DB: {e}")
             return []
 
         return self._deduplicate_entries(entries)
@@ -392,10 +407,10 @@ class TravelChatbot:
         ]
         
         has_indicator = any(ind in query.lower() for ind in location_indicators)
-        print(f"[DEBUG] Location check: query='{query}', has_indicator={has_indicator}")
+        logger.debug(f"Location check: query='{query}', has_indicator={has_indicator}")
         
         if not has_indicator:
-            print(f"[DEBUG] No location indicator found, skipping location-aware search")
+            logger.debug("No location indicator found, skipping location-aware search")
             return {"target": query, "reference": None, "radius_km": 2, "has_reference": False}
         
         # Use GPT to extract entities
@@ -433,11 +448,11 @@ class TravelChatbot:
                     "has_reference": bool(parsed.get("reference"))
                 }
                 if result["has_reference"]:
-                    print(f"[INFO] Location reference extracted: {result['reference']}")
+                    logger.info(f"Location reference extracted: {result['reference']}")
                 return result
                 
         except Exception as e:
-            print(f"[WARN] Location extraction failed: {e}")
+            logger.warning(f"Location extraction failed: {e}")
         
         return {"target": query, "reference": None, "radius_km": 2, "has_reference": False}
 
@@ -463,7 +478,7 @@ class TravelChatbot:
             ).first()
             
             if place is not None and place.latitude is not None and place.longitude is not None:
-                print(f"[INFO] Resolved '{location_name}' from places DB: {place.latitude}, {place.longitude}")
+                logger.info(f"Resolved '{location_name}' from places DB: {place.latitude}, {place.longitude}")
                 lat_value = float(place.latitude)  # type: ignore[arg-type]
                 lng_value = float(place.longitude)  # type: ignore[arg-type]
                 return {
@@ -472,7 +487,7 @@ class TravelChatbot:
                     "source": "database"
                 }
         except Exception as e:
-            print(f"[WARN] Places DB coordinate lookup failed: {e}")
+            logger.warning(f"Places DB coordinate lookup failed: {e}")
         
         # Priority 2: Use Nominatim (OpenStreetMap) - FREE geocoding
         try:
@@ -499,17 +514,17 @@ class TravelChatbot:
                 if results:
                     lat = float(results[0]["lat"])
                     lng = float(results[0]["lon"])
-                    print(f"[INFO] Resolved '{location_name}' from Nominatim: {lat}, {lng}")
+                    logger.info(f"Resolved '{location_name}' from Nominatim: {lat}, {lng}")
                     return {
                         "lat": lat,
                         "lng": lng,
                         "source": "nominatim"
                     }
                 else:
-                    print(f"[WARN] Nominatim found no results for: {location_name}")
+                    logger.warning(f"Nominatim found no results for: {location_name}")
                     
         except Exception as e:
-            print(f"[WARN] Nominatim geocoding failed: {e}")
+            logger.warning(f"Nominatim geocoding failed: {e}")
         
         return None
 
@@ -539,13 +554,13 @@ class TravelChatbot:
         try:
             import googlemaps
         except ImportError:
-            print("[WARN] googlemaps not installed, skipping fallback")
+            logger.warning("googlemaps not installed, skipping fallback")
             return []
 
         # Get Google Maps API key from environment
         api_key = os.getenv('GOOGLE_MAPS_API_KEY')
         if not api_key:
-            print("[WARN] GOOGLE_MAPS_API_KEY not configured, skipping fallback")
+            logger.warning("GOOGLE_MAPS_API_KEY not configured, skipping fallback")
             return []
 
         results: List[Dict[str, Any]] = []
@@ -556,7 +571,7 @@ class TravelChatbot:
         
         # Log search parameters
         if center_lat is not None:
-            print(f"[INFO] Location-aware search at ({search_lat}, {search_lng}) radius={radius_meters}m")
+            logger.info(f"Location-aware search at ({search_lat}, {search_lng}) radius={radius_meters}m")
         
         try:
             # Initialize Google Maps client with timeout
@@ -568,7 +583,7 @@ class TravelChatbot:
             else:
                 search_query = query  # Don't add province when searching near specific location
             
-            print(f"[INFO] Google Maps fallback search: {search_query}")
+            logger.info(f"Google Maps fallback search: {search_query}")
             
             # Perform Places search with timeout
             def do_search():
@@ -581,22 +596,22 @@ class TravelChatbot:
                     )
                     return response.get('results', [])[:limit]
                 except googlemaps.exceptions.Timeout:
-                    print("[WARN] Google Maps search timed out")
+                    logger.warning("Google Maps search timed out")
                     return []
                 except Exception as e:
-                    print(f"[WARN] Google Maps search error: {e}")
+                    logger.warning(f"Google Maps search error: {e}")
                     return []
             
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(do_search)
-                try:
-                    search_results = future.result(timeout=15)
-                except concurrent.futures.TimeoutError:
-                    print("[WARN] Google Maps search timed out after 15 seconds")
-                    return []
-                except Exception as e:
-                    print(f"[WARN] Google Maps search failed: {e}")
-                    return []
+            future = _IO_EXECUTOR.submit(do_search)
+            try:
+                search_results = future.result(timeout=15)
+            except concurrent.futures.TimeoutError:
+                future.cancel()  # Only drops it if still queued; a running search finishes in the background
+                logger.warning("Google Maps search timed out after 15 seconds")
+                return []
+            except Exception as e:
+                logger.warning(f"Google Maps search failed: {e}")
+                return []
             
             # Normalize Google Maps results to Place schema
             for idx, result in enumerate(search_results):
@@ -657,12 +672,12 @@ class TravelChatbot:
                 results.append(normalized)
             
             if results:
-                print(f"[INFO] Google Maps fallback found {len(results)} results")
+                logger.info(f"Google Maps fallback found {len(results)} results")
             else:
-                print("[INFO] Google fallback found no results")
+                logger.info("Google fallback found no results")
                 
         except Exception as e:
-            print(f"[ERROR] Google search fallback failed: {e}")
+            logger.error(f"Google search fallback failed: {e}")
             return []
         
         return results
@@ -899,7 +914,7 @@ class TravelChatbot:
         try:
             return self.gpt_service.extract_query_entities(query, self.dataset_summary)
         except Exception as exc:
-            print(f"[WARN] Query interpretation failed: {exc}")
+            logger.warning(f"Query interpretation failed: {exc}")
             return {"keywords": [], "places": []}
 
     def _is_main_attractions_query(self, query: str) -> bool:
@@ -1125,7 +1140,7 @@ class TravelChatbot:
         else:
         
             # Create cache key for this search
-            cache_key = hashlib.md5(f"{query}:{limit_value}:{is_main_attraction_query}:{requested_category}".encode()).hexdigest()
+            cache_key = text_digest(f"{query}:{limit_value}:{is_main_attraction_query}:{requested_category}")
             current_time = time.time()
             
             # Check query result cache first
@@ -1827,7 +1842,7 @@ class TravelChatbot:
                     }
                 }
             except Exception as exc:
-                print(f"[ERROR] Pure GPT fallback failed: {exc}")
+                logger.error(f"Pure GPT fallback failed: {exc}")
         # Static persona reply if GPT path fails
         if language == 'th':
             reply = (
@@ -1963,15 +1978,14 @@ class TravelChatbot:
         clean_question = intent_classification["clean_question"]
         
         # Parallelize keyword detection and matcher analysis for faster processing
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            analysis_future = executor.submit(
-                self._interpret_query_keywords,
-                clean_question
-            ) if trimmed_query else None
-            matcher_future = executor.submit(self._matcher_analysis, clean_question)
-            
-            analysis = analysis_future.result() if analysis_future else {"keywords": [], "places": []}
-            matcher_signals = matcher_future.result()
+        analysis_future = _IO_EXECUTOR.submit(
+            self._interpret_query_keywords,
+            clean_question
+        ) if trimmed_query else None
+        matcher_future = _IO_EXECUTOR.submit(self._matcher_analysis, clean_question)
+
+        analysis = analysis_future.result() if analysis_future else {"keywords": [], "places": []}
+        matcher_signals = matcher_future.result()
         
         keyword_pool = self._merge_keywords(
             intent_classification.get("keywords") or [],
@@ -2103,11 +2117,11 @@ class TravelChatbot:
                 
                 if google_results:
                     matched_data = google_results
-                    print(f"[INFO] Google fallback successful: {len(google_results)} results")
+                    logger.info(f"Google fallback successful: {len(google_results)} results")
                 else:
-                    print("[WARN] Google fallback returned no results")
+                    logger.warning("Google fallback returned no results")
             except Exception as e:
-                print(f"[ERROR] Google fallback failed: {e}")
+                logger.error(f"Google fallback failed: {e}")
                 import traceback
                 traceback.print_exc()
         
@@ -2215,7 +2229,7 @@ class TravelChatbot:
                 })
                 
             except Exception as e:
-                print(f"[ERROR] GPT generation failed: {e}")
+                logger.error(f"GPT generation failed: {e}")
                 simple_response = self._create_simple_response(matched_data, language, is_specific_place=is_specific_place)
                 return finalize_response({
                     'response': simple_response,
@@ -2288,12 +2302,11 @@ class TravelChatbot:
         yield {"type": "intent", "intent_type": intent_type}
         
         # Analyze and match data
-        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-            analysis_future = executor.submit(self._interpret_query_keywords, clean_question) if trimmed_query else None
-            matcher_future = executor.submit(self._matcher_analysis, clean_question)
-            
-            analysis = analysis_future.result() if analysis_future else {"keywords": [], "places": []}
-            matcher_signals = matcher_future.result()
+        analysis_future = _IO_EXECUTOR.submit(self._interpret_query_keywords, clean_question) if trimmed_query else None
+        matcher_future = _IO_EXECUTOR.submit(self._matcher_analysis, clean_question)
+
+        analysis = analysis_future.result() if analysis_future else {"keywords": [], "places": []}
+        matcher_signals = matcher_future.result()
         
         keyword_pool = self._merge_keywords(
             intent_classification.get("keywords") or [],
@@ -2414,33 +2427,35 @@ class TravelChatbot:
 
 
 _CHATBOT: Optional[TravelChatbot] = None
+_CHATBOT_LOCK = threading.Lock()
 
 
-def chat_with_bot(message: str, user_id: str = "default") -> str:
+def get_chatbot() -> TravelChatbot:
+    """Return the process-wide TravelChatbot, building it on first use."""
     global _CHATBOT
     if _CHATBOT is None:
-        _CHATBOT = TravelChatbot()
-    
-    result = _CHATBOT.get_response(message, user_id)
+        # Concurrent first requests wait here instead of each loading the DB
+        with _CHATBOT_LOCK:
+            if _CHATBOT is None:
+                _CHATBOT = TravelChatbot()
+                logger.info("✓ Chatbot singleton initialized")
+    return _CHATBOT
+
+
+def chat_with_bot(message: str, user_id: str = "default") -> str:
+    result = get_chatbot().get_response(message, user_id)
     return result['response']
 
 
 def chat_with_bot_stream(message: str, user_id: str = "default"):
     """Streaming version of chat_with_bot that yields SSE chunks."""
-    global _CHATBOT
-    if _CHATBOT is None:
-        _CHATBOT = TravelChatbot()
-    
     # Yield chunks from the streaming response
-    for chunk in _CHATBOT.get_response_stream(message, user_id):
-        yield chunk
+    yield from get_chatbot().get_response_stream(message, user_id)
 
 
 def get_chat_response(message: str, user_id: str = "default") -> Dict[str, Any]:
-    global _CHATBOT
-    if _CHATBOT is None:
-        _CHATBOT = TravelChatbot()
-    language = _CHATBOT._detect_language(message)
+    chatbot = get_chatbot()
+    language = chatbot._detect_language(message)
 
     # Detect DB connectivity (adaptive branch)
     db_connected = False
@@ -2448,21 +2463,21 @@ def get_chat_response(message: str, user_id: str = "default") -> Dict[str, Any]:
         # Bound DB connectivity check to avoid blocking the API when DB is unreachable
         try:
             svc = get_db_service()
-            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                future = executor.submit(svc.test_connection)
-                try:
-                    db_connected = future.result(timeout=5)  # Increased to 5 seconds for remote DB
-                except concurrent.futures.TimeoutError:
-                    logger.warning("DB connectivity check timed out; proceeding without DB")
-                    db_connected = False
+            future = _IO_EXECUTOR.submit(svc.test_connection)
+            try:
+                db_connected = future.result(timeout=5)  # Increased to 5 seconds for remote DB
+            except concurrent.futures.TimeoutError:
+                future.cancel()  # Only drops it if still queued; a running ping finishes in the background
+                logger.warning("DB connectivity check timed out; proceeding without DB")
+                db_connected = False
         except Exception as exc:
             logger.warning(f"DB connectivity check failed: {exc}")
             db_connected = False
 
     if not db_connected:
-        result = _CHATBOT._pure_gpt_response(message, language)
+        result = chatbot._pure_gpt_response(message, language)
     else:
-        result = _CHATBOT.get_response(message, user_id)
+        result = chatbot.get_response(message, user_id)
 
     # Attach model + character info uniformly
     try:
@@ -2471,7 +2486,7 @@ def get_chat_response(message: str, user_id: str = "default") -> Dict[str, Any]:
     except Exception:
         result['model'] = 'gpt-4o'
     try:
-        result['character'] = (_CHATBOT.character_profile or {}).get('name', 'NongPlaToo')
+        result['character'] = (chatbot.character_profile or {}).get('name', 'NongPlaToo')
     except Exception:
         result['character'] = 'NongPlaToo'
     # Add source qualifier for clarity
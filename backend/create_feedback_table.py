@@ -1,7 +1,9 @@
 """Create the message_feedback table in the database.
 
 Note: The table will be created automatically when you run app.py
-because init_db() is called on startup.
+because init_db() is called on startup. Indexes added to an existing table
+are built by ``python -m backend.db_migrations`` (run by entrypoint.sh when
+RUN_DB_MIGRATIONS=1).
 
 You can also run this script directly to create the table manually.
 """
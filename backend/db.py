@@ -10,8 +10,9 @@ This module provides:
    - get_db_url()
    - get_engine()
    - get_session_factory()
+   - get_scoped_session() / remove_scoped_session()
    - get_db()
-   - init_db()
+   - init_db() / index_is_valid()
 
 3. High-level utilities for place search (all use SQL-level filtering):
    - search_places(keyword, limit, attraction_type=None) → search with optional attraction_type filter
@@ -53,9 +54,10 @@ from sqlalchemy import (
     DateTime,
     func,
     cast,
+    Index,
 )
 from sqlalchemy.engine import Engine
-from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.orm import Session, declarative_base, scoped_session, sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 
 try:
@@ -102,96 +104,110 @@ class Place(Base):
 
     def to_dict(self) -> Dict[str, object]:
         """Convert to dict with chatbot-compatible field names and defaults."""
-        # Extract city from address if available
-        city_value = ""
-        if self.address is not None:
-            # Try to extract city/district from address
-            city_match = re.search(r"(อำเภอ|อ\.)\s*([^\s,]+)", str(self.address))
-            if city_match:
-                city_value = city_match.group(2)
-
-        # Build type list from category/attraction type
-        type_candidates: list[str] = []
-        for val in (self.attraction_type, self.category):
-            if isinstance(val, str) and val.strip():
-                type_candidates.append(val)
-        type_value = type_candidates
-
-        # Normalize image_url from various formats (JSON list, comma/semicolon/pipe/newline separated)
-        def _parse_images(raw: Any) -> list[str]:
-            urls: list[str] = []
-            if isinstance(raw, (list, tuple, set)):
-                urls = [str(u).strip() for u in raw if u]
-            elif isinstance(raw, str):
-                stripped = raw.strip()
-                # Try JSON array first
-                if stripped.startswith("["):
-                    try:
-                        parsed = json.loads(stripped)
-                        if isinstance(parsed, list):
-                            urls = [str(u).strip() for u in parsed if u]
-                    except Exception:
-                        urls = []
-                if not urls:
-                    # Fallback split by common delimiters
-                    for token in re.split(r"[,;|\n]+", stripped):
-                        token = token.strip()
-                        if token:
-                            urls.append(token)
-            # Deduplicate while preserving order
-            seen = set()
-            deduped: list[str] = []
-            for u in urls:
-                if u and u not in seen:
-                    seen.add(u)
-                    deduped.append(u)
-            return deduped
-
-        images = _parse_images(self.image_url)
-
-        def _to_float(value: Any) -> float | None:
-            try:
-                return float(value) if value is not None else None
-            except (TypeError, ValueError):
-                return None
-
-        # Build google maps link if missing but coordinates exist
-        maps_link = self.google_maps_link
-        if not maps_link and self.latitude and self.longitude:  # type: ignore
-            maps_link = f"https://www.google.com/maps/search/?api=1&query={self.latitude},{self.longitude}"
-
-        return {
-            "id": str(self.id),
-            "name": self.name,
-            "place_name": self.name,  # Use name as place_name
-            "description": self.description,
-            "address": self.address,
-            "latitude": _to_float(self.latitude),
-            "longitude": _to_float(self.longitude),
-            "opening_hours": self.opening_hours,
-            "price_range": self.price_range,
-            "city": city_value,
-            "province": "สมุทรสงคราม",  # Default province
-            "type": type_value,
-            "category": self.category,
-            "rating": None,
-            "reviews": None,
-            "tags": type_value,
-            "highlights": type_value,
-            "place_information": {
-                "detail": self.description,
-                "category_description": self.category or (type_value[0] if type_value else None),
-            },
-            "images": images,
-            "attraction_type": self.attraction_type,
-            "source": "database",
-            "google_maps_link": maps_link,
-        }
+        return place_to_dict(self)
 
     def __repr__(self) -> str:  # pragma: no cover - debug helper
         return f"Place(id={self.id!r}, name={self.name!r}, category={self.category!r})"
 
 
+# Every Place column except the embedding, which only semantic search reads.
+# A Core ``select(*PLACE_COLUMNS)`` returns Rows that place_to_dict accepts
+# directly, skipping ORM instance construction on list endpoints.
+PLACE_COLUMNS = tuple(c for c in Place.__table__.c if c.name != "description_embedding")
+
+
+def place_to_dict(place: Any) -> Dict[str, object]:
+    """Convert a Place, or a Row of PLACE_COLUMNS, to the API dict."""
+    # Extract city from address if available
+    city_value = ""
+    if place.address is not None:
+        # Try to extract city/district from address
+        city_match = re.search(r"(อำเภอ|อ\.)\s*([^\s,]+)", str(place.address))
+        if city_match:
+            city_value = city_match.group(2)
+
+    # Build type list from category/attraction type
+    type_candidates: list[str] = []
+    for val in (place.attraction_type, place.category):
+        if isinstance(val, str) and val.strip():
+            type_candidates.append(val)
+    type_value = type_candidates
+
+    # Normalize image_url from various formats (JSON list, comma/semicolon/pipe/newline separated)
+    def _parse_images(raw: Any) -> list[str]:
+        urls: list[str] = []
+        if isinstance(raw, (list, tuple, set)):
+            urls = [str(u).strip() for u in raw if u]
+        elif isinstance(raw, str):
+            stripped = raw.strip()
+            # Try JSON array first
+            if stripped.startswith("["):
+                try:
+                    parsed = json.loads(stripped)
+                    if isinstance(parsed, list):
+                        urls = [str(u).strip() for u in parsed if u]
+                except Exception:
+                    urls = []
+            if not urls:
+                # Fallback split by common delimiters
+                for token in re.split(r"[,;|\n]+", stripped):
+                    token = token.strip()
+                    if token:
+                        urls.append(token)
+        # Deduplicate while preserving order
+        seen = set()
+        deduped: list[str] = []
+        for u in urls:
+            if u and u not in seen:
+                seen.add(u)
+                deduped.append(u)
+        return deduped
+
+    images = _parse_images(place.image_url)
+
+    def _to_float(value: Any) -> float | None:
+        try:
+            return float(value) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    # Build google maps link if missing but coordinates exist
+    maps_link = place.google_maps_link
+    if not maps_link and place.latitude and place.longitude:  # type: ignore
+        maps_link = f"https://www.google.com/maps/search/?api=1&query={place.latitude},{place.longitude}"
+
+    return {
+        "id": str(place.id),
+        "name": place.name,
+        "place_name": place.name,  # Use name as place_name
+        "description": place.description,
+        "address": place.address,
+        "latitude": _to_float(place.latitude),
+        "longitude": _to_float(place.longitude),
+        "opening_hours": place.opening_hours,
+        "price_range": place.price_range,
+        "city": city_value,
+        "province": "สมุทรสงคราม",  # Default province
+        "type": type_value,
+        "category": place.category,
+        "rating": None,
+        "reviews": None,
+        "tags": type_value,
+        "highlights": type_value,
+        "place_information": {
+            "detail": place.description,
+            "category_description": place.category or (type_value[0] if type_value else None),
+        },
+        "images": images,
+        "attraction_type": place.attraction_type,
+        "source": "database",
+        "google_maps_link": maps_link,
+    }
+
+
+FEEDBACK_CHAT_LOG_ID_INDEX = "uq_message_feedback_chat_log_id"
+
+
 class MessageFeedback(Base):
     """ORM model for storing AI response feedback (likes/dislikes)."""
     
@@ -209,6 +225,16 @@ class MessageFeedback(Base):
     created_at = Column(DateTime, default=func.now())  # timestamp without time zone
     chat_log_id = Column(Integer, nullable=True)  # integer - Reference to chat_logs table
     
+    __table_args__ = (
+        # /api/feedback/stats: latest dislikes (btree scans backwards for DESC)
+        Index("ix_message_feedback_type_created", "feedback_type", "created_at"),
+        # /api/feedback upserts on chat_log_id (ON CONFLICT needs it unique).
+        # Existing databases get it from backend.db_migrations.
+        Index(FEEDBACK_CHAT_LOG_ID_INDEX, "chat_log_id", unique=True),
+        # /api/feedback/stats: GROUP BY source, intent, feedback_type as an index-only scan
+        Index("ix_message_feedback_source_intent_type", "source", "intent", "feedback_type"),
+    )
+    
     def to_dict(self) -> Dict[str, object]:
         return {
             "id": self.id,
@@ -374,7 +400,6 @@ def get_cached_location(location_name: str) -> Dict[str, float] | None:
         {"lat": 13.xxx, "lng": 100.xxx, "source": "cache"} or None
     """
     try:
-        init_db()
         session_factory = get_session_factory()
         
         with session_factory() as session:
@@ -402,7 +427,6 @@ def save_location_to_cache(location_name: str, lat: float, lng: float, source: s
         True if saved successfully, False otherwise
     """
     try:
-        init_db()
         session_factory = get_session_factory()
         
         with session_factory() as session:
@@ -437,7 +461,6 @@ def save_google_place_to_db(place_data: Dict[str, Any]) -> bool:
         True if saved successfully, False otherwise
     """
     try:
-        init_db()
         session_factory = get_session_factory()
         
         with session_factory() as session:
@@ -546,18 +569,59 @@ def get_db_url() -> str:
 
 _ENGINE: Engine | None = None
 _SESSION_FACTORY: sessionmaker | None = None
+_SCOPED_SESSION: scoped_session | None = None
+_DB_INITIALIZED = False
 _SENTENCE_MODEL = None
 
 
+def _gevent_wait_callback(conn, timeout=None) -> None:
+    """psycopg2 wait callback that parks the current greenlet instead of the worker."""
+    import psycopg2.extensions
+    from gevent.socket import wait_read, wait_write
+
+    while True:
+        state = conn.poll()
+        if state == psycopg2.extensions.POLL_OK:
+            break
+        elif state == psycopg2.extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == psycopg2.extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise psycopg2.OperationalError(f"Bad result from poll: {state!r}")
+
+
+def _make_psycopg_green() -> None:
+    """Let DB I/O yield to other greenlets when running under gevent workers.
+
+    psycopg2 is a C extension, so gevent's monkey-patching does not reach it and
+    a slow query would block every request on the worker. Installing a wait
+    callback switches libpq to async mode and hands waits to the gevent hub.
+    """
+    try:
+        from gevent import monkey
+        import psycopg2.extensions
+    except ImportError:
+        return
+    if monkey.is_module_patched("socket"):
+        psycopg2.extensions.set_wait_callback(_gevent_wait_callback)
+
+
 def get_engine() -> Engine:
     """Return a singleton SQLAlchemy Engine."""
     global _ENGINE
     if _ENGINE is None:
+        _make_psycopg_green()
         connect_timeout_seconds = int(os.getenv("DB_CONNECT_TIMEOUT_SECONDS", "3"))
         _ENGINE = create_engine(
             get_db_url(), 
             future=True, 
-            pool_pre_ping=True,
+            # Replace connections the server or a proxy dropped while idle
+            # instead of failing the next request; pre-ping costs one
+            # round trip per checkout, so very chatty deployments can turn it
+            # off and rely on pool_recycle alone
+            pool_pre_ping=os.getenv("DB_POOL_PRE_PING", "1").lower() in ("1", "true", "yes"),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800")),
             connect_args={
                 # Fail fast if database is unreachable to avoid API timeouts
                 'connect_timeout': connect_timeout_seconds,
@@ -577,9 +641,47 @@ def get_session_factory() -> sessionmaker:
     return _SESSION_FACTORY
 
 
+def get_scoped_session() -> scoped_session:
+    """Return a registry handing out one session per thread (per greenlet under gevent).
+
+    Web handlers call ``get_scoped_session()()`` and let the app's teardown hook
+    call ``remove_scoped_session()`` instead of opening and closing their own.
+    """
+    global _SCOPED_SESSION
+    if _SCOPED_SESSION is None:
+        _SCOPED_SESSION = scoped_session(get_session_factory())
+    return _SCOPED_SESSION
+
+
+def remove_scoped_session() -> None:
+    """Close the current scoped session (if any) and return its connection to the pool."""
+    if _SCOPED_SESSION is not None:
+        _SCOPED_SESSION.remove()
+
+
 def init_db() -> None:
-    """Create ORM-declared tables if they do not exist yet."""
+    """Create ORM-declared tables that do not exist yet, once per process.
+
+    create_all only emits indexes together with a brand-new table. Indexes
+    declared later for existing tables are built by the deploy-time
+    migration (``python -m backend.db_migrations``), never from a request.
+    """
+    global _DB_INITIALIZED
+    if _DB_INITIALIZED:
+        return
     Base.metadata.create_all(get_engine())
+    _DB_INITIALIZED = True
+
+
+def index_is_valid(conn, name: str) -> bool:
+    """True if index ``name`` exists and is usable (not a failed CONCURRENTLY build).
+
+    ``conn`` may be a Connection or a Session.
+    """
+    return bool(conn.execute(
+        text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": name},
+    ).scalar())
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -626,7 +728,6 @@ def search_places(
     the chatbot can still answer using pure GPT instead of crashing the API.
     """
     try:
-        init_db()
         session_factory = get_session_factory()
         kw = f"%{keyword}%"
 
@@ -696,7 +797,6 @@ def get_attractions_by_type(attraction_type: str, limit: int = MAX_ATTRACTIONS_L
         List of all places with matching category
     """
     try:
-        init_db()
         session_factory = get_session_factory()
         
         # Search only category column with case-insensitive matching
@@ -742,7 +842,6 @@ def search_places_near_location(
         List of places sorted by distance from the center point
     """
     try:
-        init_db()
         session_factory = get_session_factory()
         kw = f"%{keyword}%"
         
@@ -918,7 +1017,6 @@ def search_places_semantic(
         # Generate embedding for the query
         query_embedding = model.encode(query)
         
-        init_db()
         session_factory = get_session_factory()
         
         with session_factory() as session:
@@ -1070,7 +1168,6 @@ def get_similar_places(
         return []
     
     try:
-        init_db()
         session_factory = get_session_factory()
         
         with session_factory() as session:
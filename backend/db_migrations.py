@@ -0,0 +1,125 @@
+"""Deploy-time schema steps that must not run inside a request.
+
+``init_db()`` only creates missing tables (and with them their declared
+indexes). Indexes added later for tables that already hold data are built
+here with ``CREATE INDEX CONCURRENTLY`` so writes keep flowing while they
+build. entrypoint.sh runs this before starting gunicorn when
+RUN_DB_MIGRATIONS=1; it can also be run by hand:
+
+    python -m backend.db_migrations
+
+Duplicate feedback votes left over from the old select-then-insert race keep
+the unique chat_log_id index from building. By default they are only
+reported and that index is skipped; deleting all but the newest vote per
+message is an explicit step:
+
+    python -m backend.db_migrations --dedupe-feedback
+
+Every step is idempotent. Keep the statements in step with the ``Index()``
+declarations in db.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+
+from sqlalchemy import text
+
+from .db import FEEDBACK_CHAT_LOG_ID_INDEX, get_engine, index_is_valid, init_db
+
+logger = logging.getLogger(__name__)
+
+# (index name, CREATE statement), applied in order
+INDEXES = (
+    (
+        "ix_message_feedback_type_created",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_message_feedback_type_created "
+        "ON message_feedback (feedback_type, created_at)",
+    ),
+    (
+        "ix_message_feedback_source_intent_type",
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_message_feedback_source_intent_type "
+        "ON message_feedback (source, intent, feedback_type)",
+    ),
+    # Last: it can fail on duplicates written while it builds (see migrate)
+    (
+        FEEDBACK_CHAT_LOG_ID_INDEX,
+        f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {FEEDBACK_CHAT_LOG_ID_INDEX} "
+        "ON message_feedback (chat_log_id)",
+    ),
+)
+
+
+def _count_duplicate_feedback(conn) -> int:
+    """Number of chat_log_ids that have more than one feedback row."""
+    return conn.execute(text(
+        "SELECT count(*) FROM (SELECT chat_log_id FROM message_feedback "
+        "GROUP BY chat_log_id HAVING count(*) > 1) dup"
+    )).scalar()
+
+
+def _dedupe_feedback(conn) -> None:
+    """Keep only the newest vote per chat_log_id so the unique index can build.
+
+    Duplicates are left over from the old select-then-insert race; the newest
+    row is the vote the user made last.
+    """
+    deleted = conn.execute(text(
+        "DELETE FROM message_feedback older USING message_feedback newer "
+        "WHERE older.chat_log_id = newer.chat_log_id AND older.id < newer.id"
+    )).rowcount
+    if deleted:
+        logger.info(f"Removed {deleted} duplicate message_feedback rows")
+
+
+def _create_index(conn, name: str, statement: str) -> None:
+    # A CONCURRENTLY build that failed half way leaves an INVALID index behind,
+    # which IF NOT EXISTS would then skip forever; drop it and build again
+    exists = conn.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+    if exists and not index_is_valid(conn, name):
+        logger.warning(f"Dropping invalid index {name} before rebuilding it")
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    conn.execute(text(statement))
+    logger.info(f"Index {name} ready")
+
+
+def migrate(dedupe_feedback: bool = False) -> None:
+    """Create missing tables, then build any missing indexes concurrently.
+
+    With ``dedupe_feedback`` duplicate votes are deleted before the unique
+    chat_log_id index is built; otherwise they are reported and that index
+    is left for a later run.
+    """
+    init_db()
+    # CONCURRENTLY cannot run inside a transaction block
+    with get_engine().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for name, statement in INDEXES:
+            if name == FEEDBACK_CHAT_LOG_ID_INDEX and not index_is_valid(conn, name):
+                # The app keeps using select-then-write until this index is
+                # valid, and that path can still race in a duplicate while the
+                # index builds; the build then fails and the next run retries
+                if dedupe_feedback:
+                    _dedupe_feedback(conn)
+                else:
+                    duplicates = _count_duplicate_feedback(conn)
+                    if duplicates:
+                        logger.warning(
+                            f"Skipping {name}: {duplicates} chat_log_ids have duplicate "
+                            "message_feedback rows; rerun with --dedupe-feedback to keep "
+                            "only the newest vote for each"
+                        )
+                        continue
+            _create_index(conn, name, statement)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--dedupe-feedback",
+        action="store_true",
+        help="delete all but the newest message_feedback row per chat_log_id",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    migrate(dedupe_feedback=args.dedupe_feedback)
@@ -0,0 +1,93 @@
+"""Load the app's .env files, from a JSON snapshot when one is current.
+
+app.py reads the first ``.env`` found walking up from the project root
+(without overriding the real environment) and then ``backend/.env`` (which
+does override). Every gunicorn worker used to re-parse both on boot. The
+snapshot holds the parsed values plus each file's mtime/size, and is only used
+while those still match, so a stale snapshot is simply ignored.
+
+Rebuild it after editing either file:
+
+    python -m backend.env_cache
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from typing import Dict, Optional
+
+from dotenv import dotenv_values, load_dotenv
+
+SNAPSHOT_NAME = ".env.cache.json"
+
+
+def _find_root_env(start_dir: str) -> str:
+    """Path of the .env ``load_dotenv()`` would pick from ``start_dir`` (may not exist)."""
+    directory = os.path.abspath(start_dir)
+    while True:
+        candidate = os.path.join(directory, ".env")
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(directory)
+        if parent == directory:
+            return os.path.join(os.path.abspath(start_dir), ".env")
+        directory = parent
+
+
+def _stamp(path: str) -> Optional[list]:
+    """[mtime_ns, size] for an existing file, None for a missing one."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _parse(path: str) -> Dict[str, str]:
+    if not os.path.isfile(path):
+        return {}
+    # Keys without a value come back as None; load_dotenv skips those too
+    return {k: v for k, v in dotenv_values(path).items() if v is not None}
+
+
+def build_snapshot(root_dir: str, backend_dir: str) -> str:
+    """Parse both .env files and write the snapshot next to backend/.env."""
+    root_env = _find_root_env(root_dir)
+    backend_env = os.path.join(backend_dir, ".env")
+    snapshot = {
+        "sources": {root_env: _stamp(root_env), backend_env: _stamp(backend_env)},
+        "root": _parse(root_env),
+        "backend": _parse(backend_env),
+    }
+    snapshot_path = os.path.join(backend_dir, SNAPSHOT_NAME)
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    os.replace(tmp_path, snapshot_path)
+    return snapshot_path
+
+
+def load_env_files(root_dir: str, backend_dir: str) -> bool:
+    """Apply the .env files to os.environ; True if the snapshot was used."""
+    try:
+        with open(os.path.join(backend_dir, SNAPSHOT_NAME), "rb") as f:
+            snapshot = json.loads(f.read())
+        if all(_stamp(path) == stamp for path, stamp in snapshot["sources"].items()):
+            for key, value in snapshot["root"].items():
+                os.environ.setdefault(key, value)
+            os.environ.update(snapshot["backend"])
+            return True
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    load_dotenv(_find_root_env(root_dir))  # Load from root if exists
+    backend_env_path = os.path.join(backend_dir, ".env")
+    if os.path.exists(backend_env_path):
+        load_dotenv(backend_env_path, override=True)  # backend/.env takes priority
+    return False
+
+
+if __name__ == "__main__":
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    print(f"Wrote {build_snapshot(os.path.dirname(backend_dir), backend_dir)}")
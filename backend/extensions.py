@@ -42,8 +42,10 @@ def init_extensions(app):
     jwt.init_app(app)
     migrate.init_app(app, db)
     
-    # Create tables if they don't exist
-    with app.app_context():
-        db.create_all()
+    # Create tables if they don't exist. This inspects the schema over the
+    # network in every worker at boot; set DB_CREATE_ALL=0 once migrations own it.
+    if os.getenv('DB_CREATE_ALL', '1').lower() in ('1', 'true', 'yes'):
+        with app.app_context():
+            db.create_all()
     
     return app
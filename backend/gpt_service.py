@@ -59,16 +59,16 @@ class GPTService:
         self.greeting_timeout = greeting_params.get("timeout_seconds", self.request_timeout)
 
         if not self.api_key:
-            print("[WARN] OPENAI_API_KEY not found")
+            logger.warning("OPENAI_API_KEY not found")
             self.client: Optional[OpenAI] = None
             return
 
         try:
             # Increase max_retries to handle transient errors better
             self.client = OpenAI(api_key=self.api_key, max_retries=2, timeout=self.request_timeout)
-            print(f"[OK] OpenAI client init (model: {self.model_name}, timeout: {self.request_timeout}s)")
+            logger.info(f"OpenAI client init (model: {self.model_name}, timeout: {self.request_timeout}s)")
         except Exception as exc:
-            print(f"[ERROR] OpenAI client init failed: {exc}")
+            logger.error(f"OpenAI client init failed: {exc}")
             self.client = None
 
     # ------------------------------------------------------------------
@@ -319,7 +319,7 @@ class GPTService:
                 "tokens_used": getattr(response.usage, "total_tokens", None) if hasattr(response, "usage") else None,
             }
         except Exception as exc:
-            print(f"[ERROR] GPT generation failed: {exc}")
+            logger.error(f"GPT generation failed: {exc}")
             payload = self._build_fallback_payload(language, user_query, context_data, "fallback_error")
             payload["error"] = str(exc)
             return payload
@@ -350,7 +350,7 @@ class GPTService:
             )
             return self._safe_extract_content(response)
         except Exception as exc:
-            print(f"[ERROR] Greeting generation failed: {exc}")
+            logger.error(f"Greeting generation failed: {exc}")
             if language == "th":
                 return "สวัสดีค่ะ! น้องปลาทูพร้อมช่วยวางแผนการเที่ยวสมุทรสงครามให้คุณค่ะ"
             return "Hello! I'm NongPlaToo, ready to help you plan your Samut Songkhram trip!"
@@ -655,7 +655,7 @@ class GPTService:
                     "places": parsed.get("places", []),
                 }
         except Exception as exc:
-            print(f"[WARN] Keyword extraction failed: {exc}")
+            logger.warning(f"Keyword extraction failed: {exc}")
         return {"keywords": [], "places": []}
 
     def _system_prompt(self, language: str) -> str:
@@ -0,0 +1,109 @@
+"""Fast JSON encode/decode helpers for hot request paths.
+
+Uses orjson when installed (Rust encoder, emits UTF-8 bytes directly) and
+falls back to the stdlib ``json`` module otherwise.
+"""
+
+from __future__ import annotations
+
+import datetime
+import decimal
+import json
+from typing import Any, Optional
+
+from flask import Response, request
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency during runtime
+    orjson = None  # type: ignore
+
+
+def _default(obj: Any) -> Any:
+    """Handle the types Flask's default provider supports but orjson does not."""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _flask_default(obj: Any) -> Any:
+    """Like ``_default``, but renders dates as HTTP dates the way jsonify always has."""
+    if isinstance(obj, datetime.date):
+        return http_date(obj)
+    return _default(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize ``obj`` to UTF-8 encoded JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+    return json.dumps(obj, ensure_ascii=False, default=_default).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    """Deserialize JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_response(obj: Any, status: int = 200) -> Response:
+    """Build an ``application/json`` response without going through jsonify."""
+    return Response(dumps(obj), status=status, mimetype="application/json")
+
+
+def parse_json_body() -> Optional[Any]:
+    """Parse the current request body as JSON.
+
+    Returns None when the body is empty or not valid JSON, mirroring
+    ``request.get_json(silent=True)``.
+    """
+    # The body is parsed exactly once, so skip werkzeug's copy into request.data
+    raw = request.get_data(cache=False)
+    if not raw:
+        return None
+    try:
+        return loads(raw)
+    except ValueError:
+        return None
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes with orjson, so ``jsonify`` gets it too.
+
+    Thai text is emitted as raw UTF-8 instead of ``\\uXXXX`` escapes. Keys are
+    no longer sorted, and any call that passes stdlib-only options (``indent``,
+    ``cls``...) falls back to the stdlib encoder, as does a missing orjson.
+    """
+
+    def _orjson_dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(
+            obj,
+            default=_flask_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._orjson_dumps(obj).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        # Bytes straight into the response; no str round trip
+        return self._app.response_class(self._orjson_dumps(obj), mimetype=self.mimetype)
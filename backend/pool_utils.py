@@ -0,0 +1,22 @@
+"""Thread pool sizing shared by app.py and backend/chat.py."""
+
+from __future__ import annotations
+
+import os
+
+
+def default_pool_size() -> int:
+    """Pool size for blocking I/O when no explicit size is configured.
+
+    Under gevent workers the stdlib is monkey-patched, so pool "threads" are
+    greenlets parked on socket reads and cost a few KB each. A pool should
+    then admit as many calls as the worker accepts connections, rather than
+    queueing the 33rd behind the first 32. Real OS threads stay at 32.
+    """
+    try:
+        from gevent import monkey
+    except ImportError:
+        return 32
+    if monkey.is_module_patched("threading"):
+        return int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))
+    return 32
@@ -1,13 +1,20 @@
 """Route handlers and helper functions for Flask application."""
 
-import datetime
 from typing import Dict, Any, Optional, Tuple
 from flask import request, jsonify, Response
 import logging
 
+from .json_utils import parse_json_body
+from .time_utils import iso_now
+
 logger = logging.getLogger(__name__)
 
 
+def _error(message: str, status_code: int) -> Tuple[Dict[str, Any], int]:
+    """Build the (body, status) pair used for error responses."""
+    return {'error': message}, status_code
+
+
 def handle_api_query(get_chat_response_func) -> Tuple[Dict[str, Any], int]:
     """
     Handle /api/query endpoint.
@@ -18,30 +25,33 @@ def handle_api_query(get_chat_response_func) -> Tuple[Dict[str, Any], int]:
     Returns:
         Tuple of (response_dict, status_code)
     """
+    data = parse_json_body()
+    if not isinstance(data, dict) or not isinstance(data.get('message'), str):
+        return _error('Message is required', 400)
+
+    user_message = data['message']
+    user_id = data.get('user_id', 'default')
+
     try:
-        data = request.get_json()
-        if not data or 'message' not in data:
-            return {'error': 'Message is required'}, 400
-        
-        user_message = data['message']
-        user_id = data.get('user_id', 'default')
-        
         result = get_chat_response_func(user_message, user_id)
-        
-        return {
-            'success': True,
-            'response': result['response'],
-            'structured_data': result.get('structured_data', []),
-            'language': result.get('language', 'th'),
-            'intent': result.get('intent'),
-            'source': result.get('source'),
-            'tokens_used': result.get('tokens_used'),
-            'timestamp': datetime.datetime.now().isoformat()
-        }, 200
-    
-    except Exception as error:
+        response_text = result['response']
+    except (KeyError, ValueError, RuntimeError) as error:
         logger.error(f"Error in /api/query: {error}")
-        return {'error': str(error)}, 500
+        return _error(str(error), 500)
+    except Exception as error:
+        logger.exception("Unexpected error in /api/query")
+        return _error(str(error), 500)
+
+    return {
+        'success': True,
+        'response': response_text,
+        'structured_data': result.get('structured_data', []),
+        'language': result.get('language', 'th'),
+        'intent': result.get('intent'),
+        'source': result.get('source'),
+        'tokens_used': result.get('tokens_used'),
+        'timestamp': iso_now()
+    }, 200
 
 
 def handle_api_chat(chat_with_bot_func) -> Tuple[Dict[str, Any], int]:
@@ -54,25 +64,27 @@ def handle_api_chat(chat_with_bot_func) -> Tuple[Dict[str, Any], int]:
     Returns:
         Tuple of (response_dict, status_code)
     """
+    data = parse_json_body()
+    if not isinstance(data, dict) or not isinstance(data.get('message'), str):
+        return _error('Message is required', 400)
+
+    user_message = data['message']
+    user_id = data.get('user_id', 'default')
+
     try:
-        data = request.get_json()
-        if not data or 'message' not in data:
-            return {'error': 'Message is required'}, 400
-        
-        user_message = data['message']
-        user_id = data.get('user_id', 'default')
-        
         bot_response = chat_with_bot_func(user_message, user_id)
-        
-        return {
-            'success': True,
-            'response': bot_response,
-            'timestamp': datetime.datetime.now().isoformat()
-        }, 200
-    
-    except Exception as error:
+    except (KeyError, ValueError, RuntimeError) as error:
         logger.error(f"Error in /api/chat: {error}")
-        return {'error': str(error)}, 500
+        return _error(str(error), 500)
+    except Exception as error:
+        logger.exception("Unexpected error in /api/chat")
+        return _error(str(error), 500)
+
+    return {
+        'success': True,
+        'response': bot_response,
+        'timestamp': iso_now()
+    }, 200
 
 
 def handle_visits(normalize_path_func, increment_visit_func, get_counts_func) -> Tuple[Dict[str, Any], int]:
@@ -87,29 +99,35 @@ def handle_visits(normalize_path_func, increment_visit_func, get_counts_func) ->
     Returns:
         Tuple of (response_dict, status_code)
     """
-    try:
-        if request.method == 'POST':
-            data = request.get_json(silent=True) or {}
-            path = normalize_path_func(data.get('path') or '/')
+    if request.method == 'POST':
+        data = parse_json_body()
+        if not isinstance(data, dict):
+            data = {}
+        raw_path = data.get('path')
+        path = normalize_path_func(raw_path if isinstance(raw_path, str) and raw_path else '/')
+        try:
             total, page_total, pages = increment_visit_func(path)
-            return {
-                'success': True,
-                'path': path,
-                'total': total,
-                'page_total': page_total,
-                'pages': pages
-            }, 200
-
-        counts = get_counts_func()
+        except (OSError, ValueError) as error:
+            logger.error(f"Error in /api/visits: {error}")
+            return _error(str(error), 500)
         return {
             'success': True,
-            'total': counts.get('total', 0),
-            'pages': counts.get('pages', {})
+            'path': path,
+            'total': total,
+            'page_total': page_total,
+            'pages': pages
         }, 200
-        
-    except Exception as error:
+
+    try:
+        counts = get_counts_func()
+    except (OSError, ValueError) as error:
         logger.error(f"Error in /api/visits: {error}")
-        return {'error': str(error)}, 500
+        return _error(str(error), 500)
+    return {
+        'success': True,
+        'total': counts.get('total', 0),
+        'pages': counts.get('pages', {})
+    }, 200
 
 
 def handle_get_messages(get_conversation_memory_func) -> Tuple[Dict[str, Any], int]:
@@ -151,7 +169,7 @@ def handle_clear_messages(get_conversation_memory_func) -> Tuple[Dict[str, Any],
         Tuple of (response_dict, status_code)
     """
     try:
-        data = request.get_json(silent=True) or {}
+        data = parse_json_body() or {}
         user_id = data.get('user_id', 'default')
         
         memory = get_conversation_memory_func()
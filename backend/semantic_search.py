@@ -3,31 +3,35 @@ Semantic search for tourism queries using sentence embeddings
 Intelligent understanding without hardcoded keywords
 """
 
+import hashlib
+import logging
 import os
 import sys
 from typing import List, Dict, Tuple, Optional
 
+logger = logging.getLogger(__name__)
+
 def safe_import():
     """Safely import dependencies with detailed error reporting"""
     try:
-        print("[INFO] Loading semantic libraries...")
+        logger.info("Loading semantic libraries...")
         
         import numpy as np
-        print("  ✓ NumPy loaded")
+        logger.debug("✓ NumPy loaded")
         
         from sentence_transformers import SentenceTransformer
-        print("  ✓ SentenceTransformers loaded")
+        logger.debug("✓ SentenceTransformers loaded")
         
         from sklearn.metrics.pairwise import cosine_similarity
-        print("  ✓ Scikit-learn loaded")
+        logger.debug("✓ Scikit-learn loaded")
         
         return True, (np, SentenceTransformer, cosine_similarity)
         
     except ImportError as e:
-        print(f"[ERROR] Missing dependency: {e}")
+        logger.error(f"Missing dependency: {e}")
         return False, None
     except Exception as e:
-        print(f"[ERROR] Import failed: {e}")
+        logger.error(f"Import failed: {e}")
         return False, None
 
 # Try to load dependencies
@@ -41,6 +45,14 @@ else:
     SentenceTransformer = None  
     cosine_similarity = None
 
+MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+# Precomputed knowledge-area embeddings are saved here and memory-mapped on
+# later starts, so only the first boot pays the encode.
+EMBEDDINGS_CACHE_DIR = os.getenv(
+    'SEMANTIC_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Data', 'cache'),
+)
+
 _MODEL = None
 _EMBEDDINGS = None
 
@@ -122,23 +134,69 @@ def get_model():
         return _MODEL
     if not LIBRARIES_AVAILABLE or SentenceTransformer is None:
         raise ImportError("Semantic search libraries not available")
-    print("[INFO] Loading semantic model (singleton)...")
-    _MODEL = SentenceTransformer('paraphrase-multilingual-MiniLM-L12-v2')
-    print("[OK] Semantic model loaded (singleton)")
+    logger.info("Loading semantic model (singleton)...")
+    _MODEL = SentenceTransformer(MODEL_NAME)
+    logger.info("Semantic model loaded (singleton)")
     return _MODEL
 
 
+def _embeddings_cache_path() -> str:
+    """On-disk cache file, keyed by model name and the knowledge-area phrases."""
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update(MODEL_NAME.encode("utf-8"))
+    for area, phrases in KNOWLEDGE_AREAS.items():
+        digest.update(area.encode("utf-8"))
+        for phrase in phrases:
+            digest.update(b"\0" + phrase.encode("utf-8"))
+    return os.path.join(EMBEDDINGS_CACHE_DIR, f"knowledge-embeddings-{digest.hexdigest()}.npy")
+
+
+def _encode_knowledge_areas():
+    """Encode every phrase in one batched call and cache the matrix on disk."""
+    cache_path = _embeddings_cache_path()
+    try:
+        matrix = np.load(cache_path, mmap_mode="r")
+        logger.info("Loaded semantic embeddings from %s", cache_path)
+        return matrix
+    except (OSError, ValueError):
+        pass
+
+    phrases = [phrase for area_phrases in KNOWLEDGE_AREAS.values() for phrase in area_phrases]
+    matrix = get_model().encode(
+        phrases,
+        batch_size=64,
+        show_progress_bar=False,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+    )
+    try:
+        os.makedirs(EMBEDDINGS_CACHE_DIR, exist_ok=True)
+        # Write then rename so a concurrent worker never maps a half-written file
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as handle:
+            np.save(handle, matrix)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not cache semantic embeddings: {e}")
+    return matrix
+
+
 def get_embeddings():
     """Compute embeddings once and reuse."""
     global _EMBEDDINGS
     if _EMBEDDINGS is not None:
         return _EMBEDDINGS
-    model = get_model()
-    print("[INFO] Computing semantic embeddings (singleton)...")
-    _EMBEDDINGS = {}
+    if not LIBRARIES_AVAILABLE or np is None:
+        raise ImportError("Semantic search libraries not available")
+    logger.info("Computing semantic embeddings (singleton)...")
+    matrix = _encode_knowledge_areas()
+    embeddings = {}
+    offset = 0
     for area, phrases in KNOWLEDGE_AREAS.items():
-        _EMBEDDINGS[area] = model.encode(phrases)
-    print("[OK] Semantic embeddings ready (singleton)")
+        embeddings[area] = matrix[offset:offset + len(phrases)]
+        offset += len(phrases)
+    _EMBEDDINGS = embeddings
+    logger.info("Semantic embeddings ready (singleton)")
     return _EMBEDDINGS
 
 class SemanticMatcher:
@@ -157,7 +215,7 @@ class SemanticMatcher:
             self.embeddings = get_embeddings()
             
         except Exception as e:
-            print(f"[ERROR] Failed to initialize semantic matcher: {e}")
+            logger.error(f"Failed to initialize semantic matcher: {e}")
             raise e
     
     def find_best_match(self, query: str, threshold: float = 0.3) -> Tuple[Optional[str], float]:
@@ -187,7 +245,7 @@ class SemanticMatcher:
                 return None, best_score
                 
         except Exception as e:
-            print(f"[ERROR] Semantic matching failed: {e}")
+            logger.error(f"Semantic matching failed: {e}")
             return None, 0.0
     
     def is_samutsongkhram_related(self, query: str, threshold: float = 0.25) -> bool:
@@ -216,7 +274,7 @@ class SemanticMatcher:
             return max_similarity >= threshold
             
         except Exception as e:
-            print(f"[ERROR] Samutsongkhram detection failed: {e}")
+            logger.error(f"Samutsongkhram detection failed: {e}")
             return False
     
     def get_similarity_scores(self, query: str) -> Dict[str, float]:
@@ -235,7 +293,7 @@ class SemanticMatcher:
             return scores
             
         except Exception as e:
-            print(f"[ERROR] Failed to get similarity scores: {e}")
+            logger.error(f"Failed to get similarity scores: {e}")
             return {}
 
 # Test function
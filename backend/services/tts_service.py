@@ -7,6 +7,8 @@ from gtts import gTTS
 import io
 import base64
 
+from ..text_utils import is_thai_text  # noqa: F401 - re-exported for callers of this module
+
 
 def generate_thai_speech(text: str, lang: str = 'th') -> dict:
     """
@@ -43,7 +45,3 @@ def generate_thai_speech(text: str, lang: str = 'th') -> dict:
             'error': str(e)
         }
 
-
-def is_thai_text(text: str) -> bool:
-    """Check if text contains Thai characters"""
-    return any('\u0e00' <= char <= '\u0e7f' for char in text)
@@ -3,10 +3,15 @@ Simple fallback for chatbot without semantic search
 Uses keyword matching only but with better organization
 """
 
+import logging
+
+logger = logging.getLogger(__name__)
+
+
 class SimpleMatcher:
     def __init__(self):
         """Initialize simple keyword matcher as fallback"""
-        print("[FALLBACK] Using simple keyword matching (semantic search not available)")
+        logger.info("Using simple keyword matching (semantic search not available)")
         
         # Enhanced keyword mapping including synonyms and variations
         self.enhanced_keywords = {
@@ -107,9 +112,9 @@ class SimpleMatcher:
         
         # Safe printing for console compatibility
         try:
-            print(f"[KEYWORD] Detected topic: {best_topic} (score: {best_score:.3f}, {len(matched)} matches)")
+            logger.debug(f"Detected topic: {best_topic} (score: {best_score:.3f}, {len(matched)} matches)")
         except UnicodeEncodeError:
-            print(f"[KEYWORD] Detected topic: {best_topic} (score: {best_score:.3f})")
+            logger.debug(f"Detected topic: {best_topic} (score: {best_score:.3f})")
         
         return best_topic if best_score >= threshold else None, best_score
     
@@ -125,9 +130,9 @@ class SimpleMatcher:
         # Simple scoring: any match = related
         is_related = matches > 0
         try:
-            print(f"[KEYWORD] Samutsongkhram-related: {is_related} ({matches} matches)")
+            logger.debug(f"Samutsongkhram-related: {is_related} ({matches} matches)")
         except UnicodeEncodeError:
-            print(f"[KEYWORD] Samutsongkhram-related: {is_related}")
+            logger.debug(f"Samutsongkhram-related: {is_related}")
         
         return is_related
 
@@ -140,14 +145,17 @@ class FlexibleMatcher:
         
         # Try to initialize semantic search
         try:
-            from semantic_search import SemanticMatcher, LIBRARIES_AVAILABLE
+            try:
+                from .semantic_search import SemanticMatcher, LIBRARIES_AVAILABLE
+            except ImportError:  # run directly as a script from backend/
+                from semantic_search import SemanticMatcher, LIBRARIES_AVAILABLE
             if LIBRARIES_AVAILABLE:
                 self.semantic_matcher = SemanticMatcher()
-                print("[OK] Semantic search enabled")
+                logger.info("Semantic search enabled")
             else:
-                print("[FALLBACK] Semantic libraries not available")
+                logger.info("Semantic libraries not available")
         except Exception as e:
-            print(f"[FALLBACK] Semantic search failed: {e}")
+            logger.info(f"Semantic search failed: {e}")
     
     def find_best_match(self, query: str, threshold: float = 0.3):
         """Try semantic first, fallback to keyword matching"""
@@ -155,7 +163,7 @@ class FlexibleMatcher:
             try:
                 return self.semantic_matcher.find_best_match(query, threshold)
             except Exception as e:
-                print(f"[ERROR] Semantic search failed, using fallback: {e}")
+                logger.error(f"Semantic search failed, using fallback: {e}")
         
         return self.simple_matcher.find_best_match(query, threshold)
     
@@ -165,7 +173,7 @@ class FlexibleMatcher:
             try:
                 return self.semantic_matcher.is_samutsongkhram_related(query, threshold)
             except Exception as e:
-                print(f"[ERROR] Semantic detection failed, using fallback: {e}")
+                logger.error(f"Semantic detection failed, using fallback: {e}")
         
         return self.simple_matcher.is_samutsongkhram_related(query, threshold)
 
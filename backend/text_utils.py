@@ -1,8 +1,48 @@
 """Utility functions for text processing and language detection."""
 
+import base64
+import hashlib
+import re
 from typing import Optional
 from .constants import THAI_CHAR_MIN_CODE, THAI_CHAR_MAX_CODE, DEFAULT_LANGUAGE
 
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - optional dependency during runtime
+    xxhash = None  # type: ignore
+
+try:
+    import pybase64
+except ImportError:  # pragma: no cover - optional dependency during runtime
+    pybase64 = None  # type: ignore
+
+# One character-class search runs in the regex engine and stops at the first
+# Thai character, instead of a Python-level compare per character
+_THAI_CHAR_RE = re.compile(f"[{THAI_CHAR_MIN_CODE}-{THAI_CHAR_MAX_CODE}]")
+
+
+def text_digest(text: str) -> int:
+    """
+    Fast 64-bit digest of text for in-memory cache keys (not for security).
+
+    Uses xxHash3 when installed and falls back to an 8-byte BLAKE2b.
+    """
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(text)
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def b64encode_text(data) -> str:
+    """
+    Base64-encode bytes (or any buffer, e.g. a memoryview) to an ASCII str.
+
+    Uses pybase64's SIMD encoder when installed, stdlib base64 otherwise;
+    the output is identical.
+    """
+    if pybase64 is not None:
+        return pybase64.b64encode_as_string(data)
+    return base64.b64encode(data).decode("ascii")
+
 
 def detect_language(text: str) -> str:
     """
@@ -17,13 +57,8 @@ def detect_language(text: str) -> str:
     if not text:
         return DEFAULT_LANGUAGE
     
-    thai_char_count = sum(
-        1 for char in text 
-        if THAI_CHAR_MIN_CODE <= char <= THAI_CHAR_MAX_CODE
-    )
-    
     # Prioritize Thai if any Thai characters are present
-    return "th" if thai_char_count > 0 else "en"
+    return "th" if _THAI_CHAR_RE.search(text) else "en"
 
 
 def is_thai_text(text: str) -> bool:
@@ -36,7 +71,7 @@ def is_thai_text(text: str) -> bool:
     Returns:
         True if text contains Thai characters, False otherwise
     """
-    return any(THAI_CHAR_MIN_CODE <= char <= THAI_CHAR_MAX_CODE for char in text)
+    return _THAI_CHAR_RE.search(text) is not None
 
 
 def normalize_whitespace(text: Optional[str]) -> str:
@@ -0,0 +1,19 @@
+"""Timestamp helpers for response payloads."""
+
+from __future__ import annotations
+
+import datetime
+import time
+
+_ISO_NOW_CACHE: tuple[int, str] = (0, "")
+
+
+def iso_now() -> str:
+    """datetime.now().isoformat(timespec='seconds'), rebuilt at most once per second."""
+    global _ISO_NOW_CACHE
+    second = int(time.time())
+    cached_second, cached_value = _ISO_NOW_CACHE
+    if second != cached_second:
+        cached_value = datetime.datetime.fromtimestamp(second).isoformat(timespec="seconds")
+        _ISO_NOW_CACHE = (second, cached_value)  # single tuple swap, safe across threads
+    return cached_value
@@ -4,20 +4,37 @@ Lightweight page-visit counter stored on disk.
 Tracks:
 - total visits across the site
 - per-path visits (normalized strings, e.g., "/", "/places", "/places/:id")
+
+Increments are buffered in memory and merged into the JSON file by a
+background thread every FLUSH_INTERVAL_SECONDS (and at exit), so a burst of
+page views costs one file write instead of one per request. Each flush
+re-reads the file before adding its deltas, so several worker processes
+can share the same file, and every tick picks up the other workers' flushes
+(by mtime/size) so reported totals don't drift per worker.
 """
 
 from __future__ import annotations
 
+import atexit
 import json
 import os
 import threading
+import time
+from collections import Counter
 from typing import Dict, Tuple
 
 BASE_DIR = os.path.dirname(__file__)
 DATA_FILE = os.path.join(BASE_DIR, "Data", "visit_counts.json")
+FLUSH_INTERVAL_SECONDS = float(os.getenv("VISIT_FLUSH_INTERVAL_SECONDS", "5"))
 
 _lock = threading.Lock()
 
+# Visits not yet written to DATA_FILE, and the file contents as of the last flush
+_pending: Counter = Counter()
+_snapshot: Dict[str, object] | None = None
+_snapshot_stamp: Tuple[int, int] | None = None  # DATA_FILE (mtime_ns, size) _snapshot was read at
+_flusher: threading.Thread | None = None
+
 
 def _ensure_dir() -> None:
     os.makedirs(os.path.dirname(DATA_FILE), exist_ok=True)
@@ -52,6 +69,85 @@ def _write_counts(counts: Dict[str, object]) -> None:
     os.replace(tmp_file, DATA_FILE)
 
 
+def _file_stamp() -> Tuple[int, int] | None:
+    try:
+        st = os.stat(DATA_FILE)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _load_snapshot() -> Dict[str, object]:
+    """Return the on-disk counts, reading the file only the first time. Caller holds _lock."""
+    global _snapshot, _snapshot_stamp
+    if _snapshot is None:
+        # Stamp first: a write landing between the two makes the next tick re-read
+        _snapshot_stamp = _file_stamp()
+        _snapshot = _read_counts()
+    return _snapshot
+
+
+def _refresh_snapshot() -> None:
+    """Re-read DATA_FILE if another process has written it since our snapshot."""
+    global _snapshot, _snapshot_stamp
+    stamp = _file_stamp()
+    with _lock:
+        if _snapshot is None or stamp == _snapshot_stamp:
+            return
+        _snapshot_stamp = stamp
+        _snapshot = _read_counts()
+
+
+def _merged_counts() -> Dict[str, object]:
+    """On-disk counts plus pending increments. Caller holds _lock."""
+    snapshot = _load_snapshot()
+    pages = dict(snapshot.get("pages") or {})
+    for path, count in _pending.items():
+        pages[path] = int(pages.get(path, 0) or 0) + count
+    total = int(snapshot.get("total", 0) or 0) + sum(_pending.values())
+    return {"total": total, "pages": pages}
+
+
+def flush() -> None:
+    """Merge pending increments into DATA_FILE."""
+    global _snapshot, _snapshot_stamp
+    with _lock:
+        if not _pending:
+            return
+        # Re-read so increments flushed by other worker processes are kept
+        counts = _read_counts()
+        pages = counts.get("pages") or {}
+        for path, count in _pending.items():
+            pages[path] = int(pages.get(path, 0) or 0) + count
+        counts["pages"] = pages
+        counts["total"] = int(counts.get("total", 0) or 0) + sum(_pending.values())
+        _write_counts(counts)
+        _pending.clear()
+        _snapshot = counts
+        _snapshot_stamp = _file_stamp()
+
+
+def _flush_loop() -> None:
+    while True:
+        time.sleep(FLUSH_INTERVAL_SECONDS)
+        try:
+            flush()
+        except OSError:
+            # Keep the deltas pending and retry on the next tick
+            continue
+        # Workers with nothing pending still pick up the others' flushes
+        _refresh_snapshot()
+
+
+def _ensure_flusher() -> None:
+    """Start the background flusher on first use (not at import, so scripts stay thread-free)."""
+    global _flusher
+    if _flusher is None:
+        _flusher = threading.Thread(target=_flush_loop, name="visit-counter-flush", daemon=True)
+        _flusher.start()
+        atexit.register(flush)
+
+
 def increment_visit(path: str) -> Tuple[int, int, Dict[str, int]]:
     """
     Increment visit counters.
@@ -61,23 +157,19 @@ def increment_visit(path: str) -> Tuple[int, int, Dict[str, int]]:
     normalized = normalize_path(path)
 
     with _lock:
-        counts = _read_counts()
-        total = int(counts.get("total", 0) or 0) + 1
-        pages = counts.get("pages") or {}
-        page_count = int(pages.get(normalized, 0) or 0) + 1
-
-        counts["total"] = total
-        pages[normalized] = page_count
-        counts["pages"] = pages
-
-        _write_counts(counts)
+        _ensure_flusher()
+        _pending[normalized] += 1
+        counts = _merged_counts()
 
-    return total, page_count, pages  # type: ignore[return-value]
+    pages = counts["pages"]
+    return counts["total"], pages[normalized], pages  # type: ignore[return-value]
 
 
 def get_counts() -> Dict[str, object]:
     with _lock:
-        return _read_counts()
+        # Started here too, so a worker that only serves reads stays current
+        _ensure_flusher()
+        return _merged_counts()
 
 
 def normalize_path(path: str | None) -> str:
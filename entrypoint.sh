@@ -21,6 +21,19 @@ echo "🔌 Using PORT: $PORT"
 echo "⚠️ Database initialization disabled (using OpenAI API and JSON files)"
 # python -c "from backend.db import init_db; init_db()" || echo "⚠️ Database initialization skipped or failed (may already be initialized)"
 
-# Start gunicorn
-echo "✅ Starting Gunicorn on 0.0.0.0:$PORT"
-exec gunicorn -b 0.0.0.0:$PORT -w 4 -t 300 --access-logfile - app:app
+# Database migrations are off by default, matching the note above. Set
+# RUN_DB_MIGRATIONS=1 to have startup create missing tables and build the
+# indexes added since (CREATE INDEX CONCURRENTLY, idempotent) before gunicorn
+# starts. A database outage must not keep the app from starting.
+if [ "${RUN_DB_MIGRATIONS:-0}" = "1" ]; then
+    echo "🗄️ Applying database migrations"
+    python -m backend.db_migrations || echo "⚠️ Database migrations failed; continuing startup"
+fi
+
+# Start gunicorn with gevent workers. Worker class, bind address and timeouts
+# live in gunicorn.conf.py; GUNICORN_WORKERS / GUNICORN_WORKER_CONNECTIONS
+# override the defaults there (app.py also reads the latter to size its pool).
+export GUNICORN_WORKERS=${GUNICORN_WORKERS:-4}
+export GUNICORN_WORKER_CONNECTIONS=${GUNICORN_WORKER_CONNECTIONS:-1000}
+echo "✅ Starting Gunicorn (gevent x$GUNICORN_WORKERS) on 0.0.0.0:$PORT"
+exec gunicorn -c gunicorn.conf.py app:app
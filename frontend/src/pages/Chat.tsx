@@ -243,7 +243,8 @@ const Chat = () => {
           method: "POST",
           headers: {
             "Content-Type": "application/json",
-            "Accept": "application/json"
+            // Raw MP3 skips the base64 round trip; JSON kept for older servers
+            "Accept": "audio/mpeg, application/json;q=0.9"
           },
           body: JSON.stringify({
             text,
@@ -258,15 +259,23 @@ const Chat = () => {
           throw new Error("Failed to generate speech");
         }
 
-        const data = await response.json();
-
-        if (data.success && data.audio) {
-          // DEVICE COMPATIBILITY: Convert base64 to audio blob with error handling
-          try {
-            const audioBlob = new Blob(
+        let audioBlob: Blob | null = null;
+        if (response.headers.get("Content-Type")?.startsWith("audio/")) {
+          audioBlob = await response.blob();
+        } else {
+          const data = await response.json();
+          if (data.success && data.audio) {
+            // DEVICE COMPATIBILITY: Convert base64 to audio blob
+            audioBlob = new Blob(
               [Uint8Array.from(atob(data.audio), c => c.charCodeAt(0))],
               { type: 'audio/mp3' }
             );
+          }
+        }
+
+        if (audioBlob) {
+          // DEVICE COMPATIBILITY: Play the audio blob with error handling
+          try {
             const audioUrl = URL.createObjectURL(audioBlob);
 
             const audio = new Audio(audioUrl);
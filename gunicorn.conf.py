@@ -0,0 +1,17 @@
+"""Gunicorn settings for production (picked up automatically from the working dir).
+
+Chat/TTS handlers spend most of their time waiting on OpenAI/Google, so
+cooperative gevent workers keep serving other requests instead of blocking one
+process per in-flight call. The gevent worker monkey-patches the stdlib before
+app.py is imported.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+worker_class = "gevent"
+workers = int(os.getenv("GUNICORN_WORKERS", "4"))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))
+# Long enough for a slow GPT stream or TTS synthesis to finish
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))
+accesslog = "-"